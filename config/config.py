@@ -139,6 +139,9 @@ class MT5Config:
         self.wf_test_ratio          = opt.get("wf_test_ratio",          0.3)
         self.wf_efficiency_threshold = opt.get("wf_efficiency_threshold", 0.7)
         self.wf_timeout             = opt.get("timeout_per_window",     900)
+        self.wf_min_is_pf           = opt.get("wf_min_is_pf",           1.1)
+        self.wf_stability_check     = opt.get("wf_stability_check",     False)
+        self.wf_terminals           = opt.get("parallel_terminals",     [])
 
     def validate(self) -> dict:
         checks = {
@@ -346,11 +346,12 @@ class MT5CLI:
             # Get account summary
             account = get_account_summary()
 
-            # Calculate metrics
-            total_profit = sum(t.get('profit', 0) for t in trades)
-            winning_trades = [t for t in trades if t.get('profit', 0) > 0]
-            losing_trades = [t for t in trades if t.get('profit', 0) < 0]
-            win_rate = (len(winning_trades) / len(trades) * 100) if trades else 0
+            # Calculate metrics (profit is None on lines without a P/L field)
+            profits = [t.get('profit') or 0.0 for t in trades]
+            total_profit = sum(profits)
+            wins = sum(1 for p in profits if p > 0)
+            losses = sum(1 for p in profits if p < 0)
+            win_rate = (wins / len(trades) * 100) if trades else 0
 
             # Display
             print(f"  Period: Last {hours} hours")
@@ -362,15 +363,15 @@ class MT5CLI:
 
             print(f"\n  Trade Statistics:")
             print(f"    Total Trades:    {len(trades)}")
-            print(f"    Wins:            {len(winning_trades)}")
-            print(f"    Losses:          {len(losing_trades)}")
+            print(f"    Wins:            {wins}")
+            print(f"    Losses:          {losses}")
             print(f"    Win Rate:        {win_rate:.1f}%")
             print(f"    Total Profit:    ${total_profit:.2f}")
 
             if trades:
                 avg_profit = total_profit / len(trades)
-                largest_win = max([t.get('profit', 0) for t in trades])
-                largest_loss = min([t.get('profit', 0) for t in trades])
+                largest_win = max(profits)
+                largest_loss = min(profits)
                 print(f"    Avg/Trade:       ${avg_profit:.2f}")
                 print(f"    Largest Win:     ${largest_win:.2f}")
                 print(f"    Largest Loss:    ${largest_loss:.2f}")
@@ -379,8 +380,8 @@ class MT5CLI:
             send_daily_report(
                 total_profit=total_profit,
                 trade_count=len(trades),
-                wins=len(winning_trades),
-                losses=len(losing_trades),
+                wins=wins,
+                losses=losses,
                 account=account
             )
 
@@ -5,8 +5,11 @@ Test script for MT5 File Manager Tool
 Test all file management operations.
 """
 
+import os
 import sys
 import json
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
@@ -212,6 +215,79 @@ def test_with_class():
     return eas
 
 
+def test_list_eas_listing():
+    """Test list_eas() sorting, has_compiled, in-place edits and fresh dicts."""
+    print("\n[TEST 12] list_eas Listing")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MT5FileManager(tmp)
+        manager.experts_dir.mkdir(parents=True)
+        (manager.experts_dir / "B.mq5").write_text("b")
+        (manager.experts_dir / "A.mq5").write_text("a")
+        (manager.experts_dir / "A.ex5").write_text("compiled")
+
+        result = manager.list_eas("Experts")
+        assert [f["name"] for f in result["files"]] == ["A.mq5", "B.mq5"]
+        assert [f["has_compiled"] for f in result["files"]] == [True, False]
+
+        # Mutating a returned dict must not leak into the next call
+        result["files"][0]["size"] = -1
+        assert manager.list_eas("Experts")["files"][0]["size"] == 1
+
+        # In-place save (directory mtime unchanged) must still show up
+        dir_stat = os.stat(manager.experts_dir)
+        (manager.experts_dir / "B.mq5").write_text("bbbb")
+        os.utime(manager.experts_dir, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+        result = manager.list_eas("Experts")
+        assert result["files"][1]["size"] == 4, result["files"][1]
+
+        print_result("List EAs Listing", result)
+        return result
+
+
+def test_failed_write_drops_backup():
+    """Test a failed write leaves the EA untouched and no linked backup."""
+    print("\n[TEST 13] Failed Write Drops Backup")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MT5FileManager(tmp)
+        manager.experts_dir.mkdir(parents=True)
+        (manager.experts_dir / "A.mq5").write_text("original")
+
+        # Non-str content makes the temp file write raise
+        result = manager.write_ea_file("A", 123, backup=True)
+        assert result["status"] == "error", result
+        assert (manager.experts_dir / "A.mq5").read_text() == "original"
+        assert not list(manager.backups_dir.rglob("A.mq5"))
+        assert not (manager.experts_dir / "A.mq5.tmp").exists()
+
+        print_result("Failed Write Drops Backup", result)
+        return {"status": "success"}
+
+
+def test_write_after_dir_removed():
+    """Test writes recreate a cached directory that was deleted."""
+    print("\n[TEST 14] Write After Directory Removed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MT5FileManager(tmp)
+        assert manager.write_set_file("A", "p1", {"Lots": 0.1})["status"] == "success"
+        assert manager.write_ea_file("A", "v1")["status"] == "success"
+
+        # Directories are in the process cache now; remove them anyway
+        shutil.rmtree(manager.tester_dir / "A")
+        shutil.rmtree(manager.experts_dir)
+
+        result = manager.write_set_file("A", "p2", {"Lots": 0.2})
+        assert result["status"] == "success", result
+        result = manager.write_ea_file("A", "v2", backup=False)
+        assert result["status"] == "success", result
+        assert (manager.experts_dir / "A.mq5").read_text() == "v2"
+
+        print_result("Write After Directory Removed", result)
+        return result
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 70)
@@ -230,6 +306,9 @@ def main():
         ("Clean Backups", test_clean_backups),
         ("Write with Backup", test_update_with_backup),
         ("Class-based Usage", test_with_class),
+        ("list_eas Listing", test_list_eas_listing),
+        ("Failed Write Drops Backup", test_failed_write_drops_backup),
+        ("Write After Directory Removed", test_write_after_dir_removed),
     ]
 
     passed = 0
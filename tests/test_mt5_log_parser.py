@@ -5,10 +5,13 @@ Test script for MT5 Log Parser Tool
 Test all log parsing operations.
 """
 
+import os
 import sys
 import json
 import time
+import tempfile
 from pathlib import Path
+from datetime import datetime, timedelta
 
 # Add project to path
 project_root = Path(__file__).parent.parent.parent
@@ -218,6 +221,137 @@ def test_multiple_operations():
     }
 
 
+def _log_line(dt: datetime, message: str) -> str:
+    """One journal line in MT5's "[YYYY.MM.DD HH:MM:SS.mmm] message" format."""
+    return f"[{dt.strftime('%Y.%m.%d %H:%M:%S.%f')[:-3]}] {message}\n"
+
+
+def _write_daily_logs(logs_dir: Path, entries: list) -> None:
+    """Write (datetime, message) entries into one YYYYMMDD.log per day."""
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    by_day = {}
+    for dt, message in sorted(entries):
+        by_day.setdefault(dt.strftime("%Y%m%d"), []).append(_log_line(dt, message))
+    for day, lines in by_day.items():
+        (logs_dir / f"{day}.log").write_text("".join(lines), encoding="utf-8")
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    """Poll condition() until it is true or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_cutoff_across_daily_files():
+    """Test the hours cutoff and midnight boundaries over several daily logs."""
+    print("\n[TEST 10] Cutoff Across Daily Files")
+
+    hours = 50
+    now = datetime.now()
+    cutoff = now - timedelta(hours=hours)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_daily_logs(Path(tmp) / "logs", [
+            (cutoff - timedelta(minutes=1), "[TestEA] too old"),
+            (cutoff + timedelta(minutes=1), "[TestEA] just inside"),
+            (midnight - timedelta(days=1, milliseconds=1), "[TestEA] day before end"),
+            (midnight - timedelta(milliseconds=1), "[TestEA] yesterday end"),
+            (midnight, "[TestEA] today start"),
+            (midnight, "[OtherEA] not ours"),
+        ])
+        parser = MT5LogParser(terminal_data_path=tmp)
+        result = parser.get_ea_prints("TestEA", hours=hours)
+
+    messages = sorted(p["message"] for p in result["prints"])
+    assert result["status"] == "success", result
+    assert messages == sorted([
+        "[TestEA] just inside", "[TestEA] day before end",
+        "[TestEA] yesterday end", "[TestEA] today start",
+    ]), messages
+
+    print_result("EA Prints Across Files", result)
+    return result
+
+
+def test_entry_cache_invalidation():
+    """Test appended and rewritten log files are re-read, not served from cache."""
+    print("\n[TEST 11] Entry Cache Invalidation")
+
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_daily_logs(Path(tmp) / "logs", [(now - timedelta(minutes=5), "[TestEA] first")])
+        journal = Path(tmp) / "logs" / f"{now.strftime('%Y%m%d')}.log"
+        parser = MT5LogParser(terminal_data_path=tmp)
+        first = parser.get_ea_prints("TestEA", hours=1)
+
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write(_log_line(now - timedelta(minutes=4), "[TestEA] second"))
+        appended = parser.get_ea_prints("TestEA", hours=1)
+
+        # Same size, new content: only the mtime tells the files apart
+        stat = journal.stat()
+        journal.write_text(journal.read_text(encoding="utf-8").replace("first", "FIRST"), encoding="utf-8")
+        os.utime(journal, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        rewritten = parser.get_ea_prints("TestEA", hours=1)
+
+    assert [p["message"] for p in first["prints"]] == ["[TestEA] first"]
+    assert [p["message"] for p in appended["prints"]] == ["[TestEA] first", "[TestEA] second"]
+    assert [p["message"] for p in rewritten["prints"]] == ["[TestEA] FIRST", "[TestEA] second"]
+
+    result = {"status": "success", "prints": rewritten["prints"]}
+    print_result("Entry Cache", result)
+    return result
+
+
+def test_watch_truncate_and_replace():
+    """Test watch_journal restarts at offset 0 after truncation or replacement."""
+    print("\n[TEST 12] Watch Truncate and Replace")
+
+    now = datetime.now()
+    received = []
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_daily_logs(Path(tmp) / "logs", [(now, "start line with some padding")])
+        journal = Path(tmp) / "logs" / f"{now.strftime('%Y%m%d')}.log"
+        parser = MT5LogParser(terminal_data_path=tmp)
+        result = parser.watch_journal(
+            lambda entry: received.append(entry["message"]), check_interval=0.02
+        )
+        try:
+            assert result["status"] == "success", result
+            assert _wait_for(lambda: len(received) == 1)
+
+            with open(journal, "a", encoding="utf-8") as f:
+                f.write(_log_line(now, "appended"))
+            assert _wait_for(lambda: len(received) == 2)
+
+            # Shorter than what was already read, so it reads as a truncation
+            journal.write_text(_log_line(now, "truncated"), encoding="utf-8")
+            assert _wait_for(lambda: len(received) == 3)
+
+            replacement = journal.with_suffix(".tmp")
+            replacement.write_text(
+                _log_line(now, "replaced 1") + _log_line(now, "replaced 2"), encoding="utf-8"
+            )
+            os.replace(replacement, journal)
+            assert _wait_for(lambda: len(received) == 5)
+            time.sleep(0.1)  # nothing more should arrive
+        finally:
+            parser.stop_watch()
+
+    assert received == [
+        "start line with some padding", "appended", "truncated", "replaced 1", "replaced 2"
+    ], received
+
+    result = {"status": "success", "received": len(received)}
+    print_result("Watch Restarts", result)
+    return result
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 70)
@@ -234,6 +368,9 @@ def main():
         ("Watch with Filter", test_watch_with_filter),
         ("Class-based Usage", test_with_class),
         ("Multiple Operations", test_multiple_operations),
+        ("Cutoff Across Daily Files", test_cutoff_across_daily_files),
+        ("Entry Cache Invalidation", test_entry_cache_invalidation),
+        ("Watch Truncate and Replace", test_watch_truncate_and_replace),
     ]
 
     passed = 0
@@ -7,6 +7,8 @@ Test all notification operations.
 
 import sys
 import json
+import time
+import tempfile
 from pathlib import Path
 
 # Add project to path
@@ -260,6 +262,122 @@ def test_with_class():
     return result
 
 
+def _offline_notifier():
+    """Notifier with a configured (fake) Telegram channel that records instead of posting."""
+    config = {
+        "telegram": {"bot_token": "test-token", "chat_id": "1"},
+        "enabled_channels": ["telegram"],
+        "min_severity": "info"
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+    notifier = MT5Notifier(f.name)
+    notifier.sent = []
+    notifier._send_to_channel = lambda message, channel, severity="info": \
+        notifier.sent.append((channel, message, severity))
+    return notifier
+
+
+def _wait_for_posts(notifier, count: int, timeout: float = 5.0):
+    """Wait until the worker has made at least count posts."""
+    deadline = time.monotonic() + timeout
+    while len(notifier.sent) < count and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_rate_limited_posts_held():
+    """Test posts over RATE_LIMIT_PER_MINUTE are delivered later, not dropped."""
+    print("\n[TEST 11] Rate-limited Posts Held")
+
+    notifier = _offline_notifier()
+    try:
+        # Empty bucket, refilling at 10 posts/s
+        notifier.RATE_LIMIT_PER_MINUTE = 600
+        notifier._rate_buckets["telegram"] = [0.0, time.monotonic()]
+
+        for i in range(5):
+            notifier.send(f"Held message {i}")
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            delivered = "\n".join(message for _, message, _ in notifier.sent)
+            if all(f"Held message {i}" in delivered for i in range(5)):
+                break
+            time.sleep(0.1)
+
+        delivered = "\n".join(message for _, message, _ in notifier.sent)
+        assert all(f"Held message {i}" in delivered for i in range(5)), notifier.sent
+        assert notifier.suppressed["rate_limited"] == 0
+
+        print(f"  Posts: {len(notifier.sent)} for 5 messages")
+        return {"status": "success"}
+    finally:
+        notifier.stop_worker()
+
+
+def test_critical_severity_case():
+    """Test an upper-case "CRITICAL" still bypasses an empty rate-limit bucket."""
+    print("\n[TEST 12] Critical Severity Case")
+
+    notifier = _offline_notifier()
+    try:
+        notifier.RATE_LIMIT_PER_MINUTE = 1
+        notifier._rate_buckets["telegram"] = [0.0, time.monotonic()]
+        notifier.send("Upper-case severity", severity="CRITICAL")
+        _wait_for_posts(notifier, 1, timeout=2)
+        assert notifier.sent == [("telegram", "Upper-case severity", "critical")], notifier.sent
+
+        return {"status": "success"}
+    finally:
+        notifier.stop_worker()
+
+
+def test_send_admission():
+    """Test duplicate and rate-limit suppression in send()."""
+    print("\n[TEST 13] Send Admission")
+
+    notifier = _offline_notifier()
+    try:
+        # Same message within DEDUP_WINDOW is dropped
+        first = notifier.send("Duplicate check")
+        second = notifier.send("Duplicate check")
+        assert first["status"] == "queued", first
+        assert second["status"] == "skipped" and second["suppressed"] == ["telegram"], second
+        assert notifier.suppressed["duplicate"] == 1
+
+        # Past MAX_MESSAGES_PER_MINUTE only critical messages get through
+        notifier.MAX_MESSAGES_PER_MINUTE = 1
+        over = notifier.send("Over the limit")
+        critical = notifier.send("Critical over the limit", severity="critical")
+        assert over["status"] == "skipped", over
+        assert critical["status"] == "queued", critical
+        assert notifier.suppressed["rate_limited"] == 1
+
+        print(f"  Suppressed: {dict(notifier.suppressed)}")
+        return critical
+    finally:
+        notifier.stop_worker()
+
+
+def test_queue_full():
+    """Test a full send queue drops non-critical sends, never critical ones."""
+    print("\n[TEST 14] Queue Full")
+
+    notifier = _offline_notifier()
+    try:
+        notifier.QUEUE_CAPACITY = 0
+        full = notifier.send("Queue is full")
+        critical = notifier.send("Queue is full (critical)", severity="critical")
+        assert full["message"] == "Send queue full", full
+        assert critical["status"] == "queued", critical
+        assert notifier.suppressed["queue_full"] == 1
+
+        print(f"  Suppressed: {dict(notifier.suppressed)}")
+        return critical
+    finally:
+        notifier.stop_worker()
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 70)
@@ -277,6 +395,9 @@ def main():
         ("Async Queuing", test_async_sending),
         ("Connection Test", test_connection),
         ("Class Usage", test_with_class),
+        ("Rate-limited Posts Held", test_rate_limited_posts_held),
+        ("Send Admission", test_send_admission),
+        ("Queue Full", test_queue_full),
     ]
 
     passed = 0
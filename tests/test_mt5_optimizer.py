@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Test script for MT5 Optimizer Tool
+
+Test result parsing and walk-forward helpers (no MT5 terminal needed).
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tools.optimizer.mt5_optimizer import MT5Optimizer
+
+
+CSV_REPORT = """Pass,Result,Profit,Trades,Profit Factor,DD%,TakeProfit,StopLoss
+1,100,100.5,10,1.20,5.0,20,10
+2,150,150.0,12,2.50,4.0,30,10
+3,90,90.0,9,0.80,6.0,40,10
+4,120,,11,1.90,3.0,50,10
+5,bad,row
+"""
+
+XML_REPORT = """<?xml version="1.0"?>
+<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet"
+ xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">
+ <Worksheet ss:Name="Tester Optimizator Results">
+  <Table>
+   <Row>
+    <Cell><Data ss:Type="String">Pass</Data></Cell>
+    <Cell><Data ss:Type="String">Profit</Data></Cell>
+    <Cell><Data ss:Type="String">Trades</Data></Cell>
+    <Cell><Data ss:Type="String">Profit Factor</Data></Cell>
+    <Cell><Data ss:Type="String">Equity DD %</Data></Cell>
+    <Cell><Data ss:Type="String">TakeProfit</Data></Cell>
+   </Row>
+   <Row>
+    <Cell><Data ss:Type="Number">1</Data></Cell>
+    <Cell><Data ss:Type="Number">200</Data></Cell>
+    <Cell><Data ss:Type="Number">20</Data></Cell>
+    <Cell><Data ss:Type="Number">1.75</Data></Cell>
+    <Cell><Data ss:Type="Number">2.5</Data></Cell>
+    <Cell><Data ss:Type="Number">25</Data></Cell>
+   </Row>
+   <Row>
+    <Cell><Data ss:Type="Number">2</Data></Cell>
+    <Cell ss:Index="4"><Data ss:Type="Number">3.10</Data></Cell>
+    <Cell><Data ss:Type="Number">1.5</Data></Cell>
+    <Cell><Data ss:Type="Number">35</Data></Cell>
+   </Row>
+  </Table>
+ </Worksheet>
+</Workbook>
+"""
+
+
+def _optimizer(data_path: Path) -> MT5Optimizer:
+    """Optimizer reading from data_path, without touching a real terminal."""
+    optimizer = MT5Optimizer.__new__(MT5Optimizer)
+    optimizer.data_path = data_path
+    return optimizer
+
+
+def print_result(title: str, result: dict):
+    """Pretty print result dict."""
+    print(f"\n{'=' * 70}")
+    print(f"  {title}")
+    print(f"{'=' * 70}")
+    print(json.dumps(result, indent=2, default=str))
+
+
+def test_parse_csv():
+    """Test CSV report parsing: params exclude metric columns, bad rows skipped."""
+    print("\n[TEST 1] Parse CSV Report")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / "report.csv"
+        report.write_text(CSV_REPORT, encoding="utf-8")
+
+        results, total = _optimizer(Path(tmp))._parse_optimization_results(report_path=report)
+
+    assert total == 4, total  # the short "bad,row" line is skipped, not counted
+    assert [r["profit_factor"] for r in results] == [1.2, 2.5, 0.8, 1.9]
+    assert results[0]["params"] == {"TakeProfit": "20", "StopLoss": "10"}, results[0]
+    assert results[0]["drawdown"] == 5.0 and results[0]["total_trades"] == 10
+    assert results[3]["net_profit"] == 0.0  # empty cell reads as 0
+
+    result = {"status": "success", "total": total, "first": results[0]}
+    print_result("CSV Results", result)
+    return result
+
+
+def test_parse_spreadsheetml():
+    """Test SpreadsheetML report parsing, including ss:Index gaps."""
+    print("\n[TEST 2] Parse SpreadsheetML Report")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / "report.xml"
+        report.write_text(XML_REPORT, encoding="utf-8")
+
+        results, total = _optimizer(Path(tmp))._parse_optimization_results(report_path=report)
+
+    assert total == 2, total
+    assert results[0] == {
+        "params": {"TakeProfit": "25"},
+        "profit_factor": 1.75,
+        "net_profit": 200.0,
+        "drawdown": 2.5,
+        "total_trades": 20,
+    }, results[0]
+    # Profit and Trades skipped via ss:Index="4"
+    assert results[1]["profit_factor"] == 3.1 and results[1]["net_profit"] == 0.0
+    assert results[1]["params"] == {"TakeProfit": "35"}
+
+    result = {"status": "success", "total": total, "results": results}
+    print_result("SpreadsheetML Results", result)
+    return result
+
+
+def test_top_n():
+    """Test top_n keeps only the best rows by profit factor but counts them all."""
+    print("\n[TEST 3] Top-N Results")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / "report.csv"
+        report.write_text(CSV_REPORT, encoding="utf-8")
+
+        results, total = _optimizer(Path(tmp))._parse_optimization_results(2, report)
+
+    assert total == 4, total
+    assert [r["profit_factor"] for r in results] == [2.5, 1.9], results
+
+    result = {"status": "success", "total": total, "top": results}
+    print_result("Top-N Results", result)
+    return result
+
+
+def test_stale_fallback_ignored():
+    """Test a Tester/ file older than the run is not taken as its results."""
+    print("\n[TEST 4] Stale Fallback Ignored")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tester = Path(tmp) / "Tester"
+        tester.mkdir()
+        old = tester / "old.csv"
+        old.write_text(CSV_REPORT, encoding="utf-8")
+        stamp = time.time() - 60
+        os.utime(old, (stamp, stamp))
+
+        optimizer = _optimizer(Path(tmp))
+        missing = Path(tmp) / "report_missing.xml"
+        stale, _ = optimizer._parse_optimization_results(
+            report_path=missing, not_before=time.time()
+        )
+        fresh, _ = optimizer._parse_optimization_results(
+            report_path=missing, not_before=stamp
+        )
+
+    assert stale == [], stale
+    assert len(fresh) == 4
+
+    result = {"status": "success", "stale": len(stale), "fresh": len(fresh)}
+    print_result("Fallback Results", result)
+    return result
+
+
+def test_jitter_params():
+    """Test stability neighbours: zero values move a step, bounds are respected."""
+    print("\n[TEST 5] Jitter Params")
+
+    ranges = {"Risk": (0.0, 1.0, 0.1), "TakeProfit": (20, 30, 5)}
+    neighbours = MT5Optimizer._jitter_params(
+        {"Risk": 0.0, "TakeProfit": "30", "Comment": "x"}, ranges=ranges
+    )
+
+    assert {"Risk": 0.1, "TakeProfit": "30", "Comment": "x"} in neighbours
+    assert {"Risk": 0.0, "TakeProfit": 28, "Comment": "x"} in neighbours
+    # Nothing equal to the original, nothing outside the range
+    assert len(neighbours) == 2, neighbours
+
+    result = {"status": "success", "neighbours": neighbours}
+    print_result("Neighbours", result)
+    return result
+
+
+def test_cache_key():
+    """Test the cache key changes with tester settings."""
+    print("\n[TEST 6] Cache Key")
+
+    args = ("TestEA", "XAUUSDm", "2024.01.01", "2024.12.31", {"TakeProfit": (20, 30, 5)}, 0)
+    base = MT5Optimizer._cache_key(*args, (1, 1, 10000, "USD", 100))
+    same = MT5Optimizer._cache_key(*args, (1, 1, 10000, "USD", 100))
+    leverage = MT5Optimizer._cache_key(*args, (1, 1, 10000, "USD", 500))
+
+    assert base == same
+    assert base != leverage
+
+    result = {"status": "success", "key": base}
+    print_result("Cache Key", result)
+    return result
+
+
+def test_portable_workers_share_cache():
+    """Test portable workers use the main terminal's cache and EA build."""
+    print("\n[TEST 7] Portable Workers")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main_path, portable_path = Path(tmp) / "main", Path(tmp) / "portable"
+        experts = main_path / "MQL5" / "Experts"
+        experts.mkdir(parents=True)
+        (experts / "TestEA.ex5").write_bytes(b"build-2")
+
+        optimizer = _optimizer(main_path)
+        optimizer.cfg = SimpleNamespace(data_path=main_path, wf_terminals=[str(portable_path)])
+        optimizer.mt5_exe = main_path / "terminal64.exe"
+        optimizer.file_manager = SimpleNamespace(experts_dir=experts)
+        worker = optimizer._portable_workers()[0]
+
+        worker._install_ea("TestEA")
+        copied = portable_path / "MQL5" / "Experts" / "TestEA.ex5"
+        version = worker._ea_version("TestEA")
+        worker._store_cached_results("key", version, [{"profit_factor": 1.5}], 1)
+        cached = optimizer._load_cached_results("key", optimizer._ea_version("TestEA"), 1)
+
+        assert copied.read_bytes() == b"build-2"
+        assert copied.stat().st_mtime_ns == (experts / "TestEA.ex5").stat().st_mtime_ns
+        assert cached == ([{"profit_factor": 1.5}], 1), cached
+        assert not (portable_path / MT5Optimizer.CACHE_DIR_NAME).exists()
+
+    result = {"status": "success", "cached": cached}
+    print_result("Portable Workers", result)
+    return result
+
+
+def test_stability_score():
+    """Test stability skips failed neighbours and is not computed for PF 0."""
+    print("\n[TEST 8] Stability Score")
+
+    optimizer = _optimizer(Path("."))
+    window = {"window": 1, "oos_from": "2024.07.01", "oos_to": "2024.12.31"}
+    params, ranges = {"TakeProfit": 30}, {"TakeProfit": (20, 40, 5)}
+
+    def score(oos_pf, backtests):
+        results = iter(backtests)
+        optimizer._backtest_params = lambda *args: next(results)
+        return optimizer._stability_score("TestEA", "XAUUSDm", window, params, ranges, oos_pf)
+
+    failed = {"status": "error", "profit_factor": 0.0}
+    all_failed = score(1.5, [failed, failed])
+    all_zero = score(0.0, [{"status": "success", "profit_factor": 0.0}] * 2)
+    one_failed = score(2.0, [failed, {"status": "success", "profit_factor": 2.0}])
+    spread = score(0.1, [
+        {"status": "success", "profit_factor": 0.1}, {"status": "success", "profit_factor": 10.0}
+    ])
+
+    assert all_failed is None
+    assert all_zero is None
+    assert one_failed == 1.0
+    assert spread == 0.0  # clamped, not negative
+
+    result = {"status": "success", "one_failed": one_failed, "spread": spread}
+    print_result("Stability Score", result)
+    return result
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "=" * 70)
+    print("  MT5 Optimizer - Test Suite")
+    print("=" * 70)
+
+    tests = [
+        ("Parse CSV Report", test_parse_csv),
+        ("Parse SpreadsheetML Report", test_parse_spreadsheetml),
+        ("Top-N Results", test_top_n),
+        ("Stale Fallback Ignored", test_stale_fallback_ignored),
+        ("Jitter Params", test_jitter_params),
+        ("Cache Key", test_cache_key),
+        ("Portable Workers", test_portable_workers_share_cache),
+        ("Stability Score", test_stability_score),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            if result and result.get("status") == "success":
+                passed += 1
+            elif result:
+                failed += 1
+        except Exception as e:
+            print(f"\n[ERROR] {test_name} failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("  Test Summary")
+    print("=" * 70)
+    print(f"Passed: {passed}")
+    print(f"Failed: {failed}")
+    print(f"Total:  {passed + failed}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
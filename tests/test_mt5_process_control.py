@@ -9,6 +9,7 @@ import sys
 import time
 import json
 from pathlib import Path
+from unittest import mock
 
 # Add project to path
 project_root = Path(__file__).parent.parent.parent
@@ -23,6 +24,7 @@ from tools.process import (
     watch_mt5,
     stop_watch
 )
+import tools.process.mt5_process_control as process_module
 
 
 def print_result(title: str, result: dict):
@@ -121,6 +123,63 @@ def test_with_class():
         print_result("Stop Via Class", stop_result)
 
 
+def test_window_handle_cache():
+    """Test the MT5 window handle is reused until the window goes away."""
+    print("\n[TEST 8] Window Handle Cache")
+
+    fake_gui = mock.Mock()
+    fake_gui.FindWindow.side_effect = \
+        lambda cls, title: 1001 if cls == MT5ProcessControl.MT5_WINDOW_CLASS else 0
+    fake_gui.IsWindow.return_value = True
+    fake_gui.GetWindowText.return_value = "12345: Broker-Demo - MetaTrader 5"
+
+    with mock.patch.object(process_module, "win32gui", fake_gui):
+        controller = MT5ProcessControl()
+        assert controller._get_mt5_window() == 1001
+        assert controller._get_mt5_window() == 1001
+        assert fake_gui.FindWindow.call_count == 1  # second lookup hit the cache
+
+        # Window closed: cache dropped, nothing found by class/title/enum
+        fake_gui.IsWindow.return_value = False
+        fake_gui.FindWindow.side_effect = lambda cls, title: 0
+        assert controller._get_mt5_window() is None
+        assert controller._cached_hwnd is None
+
+    result = {"hwnd_lookups": fake_gui.FindWindow.call_count, "cache": "ok"}
+    print_result("Window Handle Cache", result)
+    return result
+
+
+def test_pid_cache():
+    """Test the last MT5 process is re-checked before scanning all processes."""
+    print("\n[TEST 9] PID Cache")
+
+    class _PsutilError(Exception):
+        pass
+
+    fake_psutil = mock.Mock()
+    fake_psutil.Error = fake_psutil.NoSuchProcess = fake_psutil.AccessDenied = _PsutilError
+    proc = mock.Mock(pid=4242, info={"pid": 4242, "name": "terminal.exe"})
+    proc.is_running.return_value = True
+    fake_psutil.process_iter.return_value = [proc]
+
+    with mock.patch.object(process_module, "psutil", fake_psutil):
+        controller = MT5ProcessControl()
+        assert controller._get_mt5_pid() == 4242
+        assert controller._get_mt5_pid() == 4242
+        assert fake_psutil.process_iter.call_count == 1  # second call skipped the scan
+
+        # Process exited: cache dropped, full scan finds nothing
+        proc.is_running.return_value = False
+        fake_psutil.process_iter.return_value = []
+        assert controller._get_mt5_pid() is None
+        assert controller._cached_proc is None
+
+    result = {"process_scans": fake_psutil.process_iter.call_count, "cache": "ok"}
+    print_result("PID Cache", result)
+    return result
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 60)
@@ -135,6 +194,8 @@ def main():
         ("Watch MT5", test_watch_mt5),
         ("Stop MT5", test_stop_mt5),
         ("Class-based Usage", test_with_class),
+        ("Window Handle Cache", test_window_handle_cache),
+        ("PID Cache", test_pid_cache),
     ]
 
     passed = 0
@@ -4,6 +4,7 @@ MT5 File Manager Tool
 Manage MT5-related files: EA source code, compiled files, configs, backups.
 
 Dependencies: pathlib, shutil, json, datetime
+Optional: orjson (faster config parsing)
 """
 
 import os
@@ -14,10 +15,56 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Use orjson for config parsing when available (accepts bytes directly)
+_json_loads = orjson.loads if orjson else json.loads
+
+# Default MT5 terminal data root, resolved once at import
+_DEFAULT_TERMINAL = Path(os.path.expanduser("~")) / "AppData" / "Roaming" / "MetaQuotes" / "Terminal"
+
+# Directories already created by this process
+_ensured_dirs = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    """Create directory (and parents) once per process."""
+    key = str(path)
+    if key not in _ensured_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(key)
+
+
+def _ok(**extra) -> Dict[str, Any]:
+    """Build a success result dict."""
+    return {"status": "success", **extra, "error": None}
+
+
+def _error(msg: str, **extra) -> Dict[str, Any]:
+    """Build an error result dict."""
+    return {"status": "error", **extra, "error": msg}
+
+
+def _open_for_write(path: Path, encoding: str = 'utf-8'):
+    """Open a file for writing in an ensured directory.
+
+    The directory cache above cannot see folders deleted behind our back,
+    so a missing parent is forgotten, recreated and the open retried once.
+    """
+    try:
+        return open(path, 'w', encoding=encoding)
+    except FileNotFoundError:
+        _ensured_dirs.discard(str(path.parent))
+        _ensure_dir(path.parent)
+        return open(path, 'w', encoding=encoding)
+
 
 class MT5FileManager:
     """
@@ -52,15 +99,15 @@ class MT5FileManager:
             config_path = Path(__file__).parent.parent.parent / "config" / "mt5_paths.json"
             if config_path.exists():
                 try:
-                    with open(config_path, 'r') as f:
-                        config = json.load(f)
-                        # Try different path options
-                        self.terminal_path = Path(config.get("mt5_data_path") or
-                                                 config.get("mt5_profiles", "").split("\\profiles")[0])
+                    with open(config_path, 'rb') as f:
+                        config = _json_loads(f.read())
+                    # Try different path options
+                    self.terminal_path = Path(config.get("mt5_data_path") or
+                                             config.get("mt5_profiles", "").split("\\profiles")[0])
                 except Exception:
-                    self.terminal_path = Path.home() / "AppData/Roaming/MetaQuotes/Terminal"
+                    self.terminal_path = _DEFAULT_TERMINAL
             else:
-                self.terminal_path = Path.home() / "AppData/Roaming/MetaQuotes/Terminal"
+                self.terminal_path = _DEFAULT_TERMINAL
 
         # Setup key directories
         self.experts_dir = self.terminal_path / self.EXPERTS_DIR
@@ -72,7 +119,7 @@ class MT5FileManager:
         self.backups_dir = self.terminal_path / self.BACKUPS_DIR
 
         # Create backup directory if it doesn't exist
-        self.backups_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(self.backups_dir)
 
     def read_ea_file(self, ea_name: str) -> Dict[str, Any]:
         """
@@ -91,15 +138,6 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "content": None,
-            "path": None,
-            "last_modified": None,
-            "size": 0,
-            "error": None
-        }
-
         try:
             # Ensure .mq5 extension
             if not ea_name.endswith(self.EA_EXTENSION):
@@ -109,9 +147,8 @@ class MT5FileManager:
 
             # Check if file exists
             if not ea_path.exists():
-                result["error"] = f"File not found: {ea_path}"
-                result["path"] = str(ea_path)
-                return result
+                return _error(f"File not found: {ea_path}", content=None, path=str(ea_path),
+                              last_modified=None, size=0)
 
             # Read content
             with open(ea_path, 'r', encoding='utf-8') as f:
@@ -121,17 +158,12 @@ class MT5FileManager:
             stat = ea_path.stat()
             last_modified = datetime.fromtimestamp(stat.st_mtime).isoformat()
 
-            result["status"] = "success"
-            result["content"] = content
-            result["path"] = str(ea_path)
-            result["last_modified"] = last_modified
-            result["size"] = stat.st_size
+            return _ok(content=content, path=str(ea_path),
+                       last_modified=last_modified, size=stat.st_size)
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error reading EA file {ea_name}: {str(e)}")
-
-        return result
+            return _error(str(e), content=None, path=None, last_modified=None, size=0)
 
     def write_ea_file(self, ea_name: str, content: str, backup: bool = True) -> Dict[str, Any]:
         """
@@ -151,14 +183,6 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "path": None,
-            "backup_path": None,
-            "message": "",
-            "error": None
-        }
-
         try:
             # Ensure .mq5 extension
             if not ea_name.endswith(self.EA_EXTENSION):
@@ -166,33 +190,52 @@ class MT5FileManager:
 
             ea_path = self.experts_dir / ea_name
 
-            # Create backup if file exists and backup requested
+            # Create backup if file exists and backup requested. The new
+            # content is swapped in with os.replace below, so the old file is
+            # never modified and the backup can simply be a hard link to it.
             backup_path = None
             if backup and ea_path.exists():
-                backup_path = self._create_backup(ea_name)
+                backup_path = self._create_backup(ea_name, link=True)
 
             # Ensure directory exists
-            ea_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Write content
-            with open(ea_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            _ensure_dir(ea_path.parent)
+
+            # Write content to a temp file, then atomically swap it in
+            tmp_path = ea_path.with_suffix(self.EA_EXTENSION + ".tmp")
+            try:
+                with _open_for_write(tmp_path) as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, ea_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                # The EA file was not replaced, so a linked backup would
+                # still share its inode; drop it instead of leaving a
+                # "backup" that changes with the live file
+                if backup_path:
+                    Path(backup_path).unlink(missing_ok=True)
+                    try:
+                        Path(backup_path).parent.rmdir()
+                    except OSError:
+                        pass
+                raise
 
-            result["status"] = "success"
-            result["path"] = str(ea_path)
-            result["backup_path"] = backup_path
-            result["message"] = f"EA file written: {ea_name}"
+            return _ok(path=str(ea_path), backup_path=backup_path,
+                       message=f"EA file written: {ea_name}")
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error writing EA file {ea_name}: {str(e)}")
-
-        return result
+            return _error(str(e), path=None, backup_path=None, message="")
 
     def list_eas(self, folder: str = "Experts") -> Dict[str, Any]:
         """
         List all EA files with metadata.
 
+        The folder is read in a single os.scandir pass; compiled files are
+        collected into a set, so "has_compiled" is a lookup instead of a
+        stat call per source file.
+
         Args:
             folder: Folder to list ("Experts", "Indicators", "Include")
 
@@ -212,13 +255,6 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "files": [],
-            "count": 0,
-            "error": None
-        }
-
         try:
             # Select directory
             if folder.lower() == "experts":
@@ -228,44 +264,41 @@ class MT5FileManager:
             elif folder.lower() == "include":
                 directory = self.include_dir
             else:
-                result["error"] = f"Unknown folder: {folder}"
-                return result
-
-            # Check if directory exists
-            if not directory.exists():
-                result["status"] = "success"
-                result["message"] = f"Directory does not exist: {directory}"
-                return result
-
-            # List .mq5 files
-            for mq5_file in directory.glob(f"*{self.EA_EXTENSION}"):
-                if mq5_file.is_file():
-                    # Check for compiled version
-                    ex5_file = mq5_file.with_suffix(self.COMPILED_EXTENSION)
-                    has_compiled = ex5_file.exists()
-
-                    # Get metadata
-                    stat = mq5_file.stat()
-                    last_modified = datetime.fromtimestamp(stat.st_mtime).isoformat()
-
-                    result["files"].append({
-                        "name": mq5_file.name,
-                        "path": str(mq5_file),
-                        "size": stat.st_size,
-                        "last_modified": last_modified,
-                        "has_compiled": has_compiled
-                    })
-
-            result["status"] = "success"
-            result["count"] = len(result["files"])
+                return _error(f"Unknown folder: {folder}", files=[], count=0)
+
+            # One pass over the folder: stat of each .mq5, names of .ex5
+            sources = []
+            compiled = set()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        stem, ext = os.path.splitext(entry.name)
+                        ext = ext.lower()
+                        if ext == self.EA_EXTENSION and entry.is_file():
+                            stat = entry.stat()
+                            sources.append((entry.name, stat.st_size, stat.st_mtime))
+                        elif ext == self.COMPILED_EXTENSION:
+                            compiled.add(stem.lower())
+            except FileNotFoundError:
+                return _ok(files=[], count=0, message=f"Directory does not exist: {directory}")
+
             # Sort by name
-            result["files"].sort(key=lambda x: x["name"])
+            sources.sort()
+            files = [
+                {
+                    "name": name,
+                    "path": str(directory / name),
+                    "size": size,
+                    "last_modified": datetime.fromtimestamp(mtime).isoformat(),
+                    "has_compiled": os.path.splitext(name)[0].lower() in compiled
+                }
+                for name, size, mtime in sources
+            ]
+            return _ok(files=files, count=len(files))
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error listing EAs in {folder}: {str(e)}")
-
-        return result
+            return _error(str(e), files=[], count=0)
 
     def backup_ea(self, ea_name: str, tag: str = "manual") -> Dict[str, Any]:
         """
@@ -284,14 +317,6 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "backup_path": None,
-            "timestamp": None,
-            "message": "",
-            "error": None
-        }
-
         try:
             # Ensure .mq5 extension
             if not ea_name.endswith(self.EA_EXTENSION):
@@ -301,21 +326,17 @@ class MT5FileManager:
 
             # Check if file exists
             if not ea_path.exists():
-                result["error"] = f"EA file not found: {ea_path}"
-                return result
+                return _error(f"EA file not found: {ea_path}", backup_path=None,
+                              timestamp=None, message="")
 
             backup_path = self._create_backup(ea_name, tag)
 
-            result["status"] = "success"
-            result["backup_path"] = backup_path
-            result["timestamp"] = datetime.now().isoformat()
-            result["message"] = f"Backup created: {backup_path}"
+            return _ok(backup_path=backup_path, timestamp=datetime.now().isoformat(),
+                       message=f"Backup created: {backup_path}")
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error backing up EA {ea_name}: {str(e)}")
-
-        return result
+            return _error(str(e), backup_path=None, timestamp=None, message="")
 
     def restore_ea(self, ea_name: str, version: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -333,13 +354,6 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "restored_from": None,
-            "message": "",
-            "error": None
-        }
-
         try:
             # Ensure .mq5 extension
             if not ea_name.endswith(self.EA_EXTENSION):
@@ -350,8 +364,7 @@ class MT5FileManager:
             backup_ea_dir = self.backups_dir / ea_name_base
 
             if not backup_ea_dir.exists():
-                result["error"] = f"No backups found for {ea_name}"
-                return result
+                return _error(f"No backups found for {ea_name}", restored_from=None, message="")
 
             # Find version to restore
             backup_file = None
@@ -368,22 +381,18 @@ class MT5FileManager:
                         break
 
             if not backup_file or not backup_file.exists():
-                result["error"] = f"Backup file not found: {backup_file}"
-                return result
+                return _error(f"Backup file not found: {backup_file}",
+                              restored_from=None, message="")
 
             # Restore file
             ea_path = self.experts_dir / ea_name
             shutil.copy2(backup_file, ea_path)
 
-            result["status"] = "success"
-            result["restored_from"] = str(backup_file)
-            result["message"] = f"Restored from {backup_file}"
+            return _ok(restored_from=str(backup_file), message=f"Restored from {backup_file}")
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error restoring EA {ea_name}: {str(e)}")
-
-        return result
+            return _error(str(e), restored_from=None, message="")
 
     def read_set_file(self, ea_name: str, profile_name: str) -> Dict[str, Any]:
         """
@@ -401,21 +410,12 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "params": {},
-            "path": None,
-            "error": None
-        }
-
         try:
             # Construct path: ea_name/profile_name.set
             set_path = self.tester_dir / ea_name / (profile_name + self.SET_EXTENSION)
 
             if not set_path.exists():
-                result["error"] = f"Set file not found: {set_path}"
-                result["path"] = str(set_path)
-                return result
+                return _error(f"Set file not found: {set_path}", params={}, path=str(set_path))
 
             # Read and parse .set file
             params = {}
@@ -428,15 +428,11 @@ class MT5FileManager:
                         key, value = line.split('=', 1)
                         params[key.strip()] = value.strip()
 
-            result["status"] = "success"
-            result["params"] = params
-            result["path"] = str(set_path)
+            return _ok(params=params, path=str(set_path))
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error reading set file {ea_name}/{profile_name}: {str(e)}")
-
-        return result
+            return _error(str(e), params={}, path=None)
 
     def write_set_file(self, ea_name: str, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -455,22 +451,15 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "path": None,
-            "count": 0,
-            "error": None
-        }
-
         try:
             # Construct path
             set_dir = self.tester_dir / ea_name
-            set_dir.mkdir(parents=True, exist_ok=True)
+            _ensure_dir(set_dir)
 
             set_path = set_dir / (profile_name + self.SET_EXTENSION)
 
             # Write parameters
-            with open(set_path, 'w', encoding='utf-8') as f:
+            with _open_for_write(set_path) as f:
                 f.write("; Strategy Tester Parameters\n")
                 f.write(f"; Generated: {datetime.now().isoformat()}\n")
                 f.write("; EA: " + ea_name + "\n")
@@ -479,15 +468,11 @@ class MT5FileManager:
                 for key, value in params.items():
                     f.write(f"{key}={value}\n")
 
-            result["status"] = "success"
-            result["path"] = str(set_path)
-            result["count"] = len(params)
+            return _ok(path=str(set_path), count=len(params))
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error writing set file {ea_name}/{profile_name}: {str(e)}")
-
-        return result
+            return _error(str(e), path=None, count=0)
 
     def clean_old_backups(self, keep_last: int = 10) -> Dict[str, Any]:
         """
@@ -505,19 +490,16 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "removed_count": 0,
-            "kept_count": 0,
-            "summary": {},
-            "error": None
-        }
+        # Counts survive an error part-way through, so the caller still
+        # learns what was already removed
+        summary = {}
+        removed_count = 0
+        kept_count = 0
 
         try:
             if not self.backups_dir.exists():
-                result["status"] = "success"
-                result["message"] = "No backups directory"
-                return result
+                return _ok(removed_count=0, kept_count=0, summary={},
+                           message="No backups directory")
 
             # Iterate through each EA's backup directory
             for ea_backup_dir in self.backups_dir.iterdir():
@@ -525,13 +507,22 @@ class MT5FileManager:
                     continue
 
                 ea_name = ea_backup_dir.name
-                versions = sorted(ea_backup_dir.iterdir(), reverse=True)
+                ea_backup_dir_s = str(ea_backup_dir)
+
+                # Sort plain names (timestamps sort lexicographically);
+                # scandir avoids building a Path object per version
+                with os.scandir(ea_backup_dir_s) as it:
+                    versions = sorted(
+                        (e.name for e in it if e.is_dir(follow_symlinks=False)),
+                        reverse=True
+                    )
 
                 removed = 0
                 kept = len(versions)
 
                 # Remove old versions
-                for version_dir in versions[keep_last:]:
+                for name in versions[keep_last:]:
+                    version_dir = os.path.join(ea_backup_dir_s, name)
                     try:
                         shutil.rmtree(version_dir)
                         removed += 1
@@ -539,30 +530,32 @@ class MT5FileManager:
                     except Exception as e:
                         logger.error(f"Error removing backup {version_dir}: {str(e)}")
 
-                result["summary"][ea_name] = {
+                summary[ea_name] = {
                     "total": len(versions),
                     "removed": removed,
                     "kept": kept
                 }
 
-                result["removed_count"] += removed
-                result["kept_count"] += kept
+                removed_count += removed
+                kept_count += kept
 
-            result["status"] = "success"
+            return _ok(removed_count=removed_count, kept_count=kept_count, summary=summary)
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error cleaning backups: {str(e)}")
+            return _error(str(e), removed_count=removed_count,
+                          kept_count=kept_count, summary=summary)
 
-        return result
-
-    def _create_backup(self, ea_name: str, tag: str = "") -> str:
+    def _create_backup(self, ea_name: str, tag: str = "", link: bool = False) -> str:
         """
         Internal method to create backup file.
 
         Args:
             ea_name: EA filename with extension
             tag: Optional tag for organization
+            link: Hard-link instead of copying. Only safe when the caller
+                  replaces the EA file afterwards rather than editing it
+                  in place (falls back to a copy if linking fails)
 
         Returns:
             Path to backup file
@@ -581,9 +574,15 @@ class MT5FileManager:
         backup_dir = self.backups_dir / ea_name_base / timestamp
         backup_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy file
+        # Copy (or link) file
         backup_path = backup_dir / ea_name
-        shutil.copy2(ea_path, backup_path)
+        if link:
+            try:
+                os.link(ea_path, backup_path)
+            except OSError:
+                shutil.copy2(ea_path, backup_path)
+        else:
+            shutil.copy2(ea_path, backup_path)
 
         return str(backup_path)
 
@@ -598,12 +597,6 @@ class MT5FileManager:
                 "error": str | None
             }
         """
-        result = {
-            "status": "error",
-            "structure": {},
-            "error": None
-        }
-
         try:
             structure = {
                 "terminal_path": str(self.terminal_path),
@@ -629,14 +622,11 @@ class MT5FileManager:
                 }
             }
 
-            result["status"] = "success"
-            result["structure"] = structure
+            return _ok(structure=structure)
 
         except Exception as e:
-            result["error"] = str(e)
             logger.error(f"Error getting directory tree: {str(e)}")
-
-        return result
+            return _error(str(e), structure={})
 
 
 # Convenience module-level functions
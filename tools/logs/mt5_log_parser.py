@@ -3,16 +3,19 @@ MT5 Log Parser Tool
 ===================
 Read and parse MT5 log files for errors, trades, and compile results.
 
-Dependencies: re, datetime, collections, (optional: watchdog)
+Dependencies: re, mmap, datetime, collections, (optional: watchdog, hyperscan)
 """
 
 import os
 import re
+import mmap
 import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable, Any
-from collections import deque
+from typing import Dict, List, Optional, Callable, Any, Tuple
+from bisect import bisect_left, bisect_right
+from collections import deque, OrderedDict
 import logging
 import threading
 
@@ -23,9 +26,39 @@ try:
 except ImportError:
     WATCHDOG_AVAILABLE = False
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+if WATCHDOG_AVAILABLE:
+    class _JournalEventHandler(FileSystemEventHandler):
+        """Invoke a callback whenever one specific file is modified."""
+
+        def __init__(self, path: Path, on_change: Callable[[], None]):
+            super().__init__()
+            self._path = os.path.normcase(os.path.abspath(path))
+            self._on_change = on_change
+
+        def on_modified(self, event):
+            if event.is_directory:
+                return
+            if os.path.normcase(os.path.abspath(event.src_path)) != self._path:
+                return
+            self.fire()
+
+        def fire(self):
+            """Run the callback, logging instead of raising errors."""
+            try:
+                self._on_change()
+            except Exception as e:
+                logger.error(f"Watch handler error: {str(e)}")
+
+
 class MT5LogParser:
     """
     Parse MetaTrader 5 log files for trading data, errors, and diagnostics.
@@ -33,9 +66,16 @@ class MT5LogParser:
 
     # Log patterns
     # Standard MT5 log format: [2025.02.19 14:30:45.123] message
+    # (kept as a regex: slicing at fixed offsets and validating the same
+    # digits/separators in Python is slower than this single match call)
     LOG_ENTRY_PATTERN = re.compile(
         r'\[(\d{4}\.\d{2}\.\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3})\]\s+(.+)'
     )
+    # Same format, for scanning a whole mapped file in bytes mode
+    LOG_ENTRY_PATTERN_B = re.compile(
+        rb'^\[(\d{4}\.\d{2}\.\d{2}[^\S\n]+\d{2}:\d{2}:\d{2}\.\d{3})\][^\S\n]+([^\n]+)',
+        re.MULTILINE
+    )
 
     # Error/Warning patterns
     ERROR_PATTERN = re.compile(r"error\s+(\d+):\s+(.+)", re.IGNORECASE)
@@ -44,9 +84,9 @@ class MT5LogParser:
         r"'(.+?)'\s+-\s+(\d+):(\d+):\s+(.+)"
     )
 
-    # Trade patterns
+    # Trade patterns: action, symbol, volume, price
     TRADE_PATTERN = re.compile(
-        r"(buy|sell|buyat|sellat|close|modify|open|position)\s+(.+?)\s+(\d+\.?\d*)\s+(.+?)\s+at\s+([\d.]+)",
+        r"\b(buy|sell|buyat|sellat|close|modify|open|position)\s+(.+?)\s+(\d+\.?\d*)\s+(?:.+?)\s+at\s+(\d+\.?\d*)",
         re.IGNORECASE
     )
     PROFIT_PATTERN = re.compile(r"(profit|loss):\s+([\d.+-]+)", re.IGNORECASE)
@@ -59,6 +99,32 @@ class MT5LogParser:
         "server_error": re.compile(r"error|failed|socket", re.IGNORECASE),
     }
 
+    # Integer id of each anomaly type (its position in ANOMALIES)
+    ANOMALY_IDS = {name: i for i, name in enumerate(ANOMALIES)}
+
+    # The ANOMALIES patterns are plain "a|b|c" literal alternations, so they
+    # are also kept as (type id, lowercase literal) pairs for substring checks
+    ANOMALY_LITERALS = [
+        (anomaly_id, literal.lower())
+        for anomaly_id, pattern in enumerate(ANOMALIES.values())
+        for literal in pattern.pattern.split("|")
+    ]
+
+    # Hyperscan database for ANOMALIES (built on first use) and per-thread
+    # scratch space, so parsers in different threads can scan concurrently
+    _anomaly_db = None
+    _anomaly_scratch = threading.local()
+
+    # Message type detection ("error" takes precedence over "warning")
+    TYPE_PATTERN = re.compile(r"(error)|warning", re.IGNORECASE)
+    ERROR_WORD_PATTERN = re.compile(r"error", re.IGNORECASE)
+
+    # Chunk size used when counting newlines in a mapped file
+    _COUNT_CHUNK = 1 << 20
+
+    # Number of log files whose parsed entries are kept in memory
+    ENTRY_CACHE_SIZE = 8
+
     def __init__(self, terminal_data_path: Optional[str] = None):
         """
         Initialize MT5 Log Parser.
@@ -86,9 +152,17 @@ class MT5LogParser:
         self.logs_dir = self.terminal_path / "logs"
         self.tester_logs_dir = self.terminal_path / "tester" / "logs"
 
+        # Parsed entries per log file: path -> (mtime_ns, size, entries, keys)
+        self._entry_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # Listing of logs_dir: (dir mtime_ns, set of normcased *.log names)
+        self._log_names_cache: Optional[Tuple[int, set]] = None
+
         # Watch state
         self.watch_active = False
         self.watch_thread = None
+        self.watch_observer = None
+        self.watch_file = None
         self.last_position = {}
 
     def get_latest_journal(self, lines: int = 100) -> Dict[str, Any]:
@@ -131,14 +205,10 @@ class MT5LogParser:
                 result["error"] = f"Journal not found: {journal_path}"
                 return result
 
-            # Read file
-            with open(journal_path, 'r', encoding='utf-8', errors='ignore') as f:
-                all_lines = f.readlines()
-
-            result["total_lines"] = len(all_lines)
+            tail, result["total_lines"] = self._read_tail(journal_path, lines)
 
             # Parse last N lines
-            for line in all_lines[-lines:]:
+            for line in tail:
                 entry = self._parse_log_line(line)
                 if entry:
                     result["entries"].append(entry)
@@ -197,55 +267,56 @@ class MT5LogParser:
             if not ea_name.endswith(".mq5"):
                 ea_name = ea_name + ".mq5"
 
-            # Read and parse
-            with open(journal_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            # Look for compile errors
+            # Look for compile errors (streamed line by line from the mapping)
             in_compile_section = False
-            for line in content.split('\n'):
-                # Check if this is a compile section for our EA
-                if ea_name in line and "compile" in line.lower():
-                    in_compile_section = True
-
-                if in_compile_section:
-                    # Try to match error/warning patterns
-                    error_match = self.ERROR_PATTERN.search(line)
-                    warning_match = self.WARNING_PATTERN.search(line)
-                    compile_match = self.COMPILE_ERROR_PATTERN.search(line)
-
-                    if error_match or compile_match:
-                        if compile_match:
-                            file, line_num, col, msg = compile_match.groups()
-                            result["errors"].append({
-                                "line": int(line_num),
-                                "error_code": col,
-                                "message": msg.strip(),
-                                "is_error": True,
-                                "is_warning": False
-                            })
-                            result["error_count"] += 1
-                        elif error_match:
-                            code, msg = error_match.groups()
+            with self._map_file(journal_path) as mm:
+                if mm and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                for raw in (iter(mm.readline, b'') if mm else ()):
+                    line = raw.decode('utf-8', 'ignore').rstrip('\r\n')
+
+                    # Check if this is a compile section for our EA
+                    if ea_name in line and "compile" in line.lower():
+                        in_compile_section = True
+
+                    if in_compile_section:
+                        # Try to match error/warning patterns
+                        error_match = self.ERROR_PATTERN.search(line)
+                        warning_match = self.WARNING_PATTERN.search(line)
+                        compile_match = self.COMPILE_ERROR_PATTERN.search(line)
+
+                        if error_match or compile_match:
+                            if compile_match:
+                                file, line_num, col, msg = compile_match.groups()
+                                result["errors"].append({
+                                    "line": int(line_num),
+                                    "error_code": col,
+                                    "message": msg.strip(),
+                                    "is_error": True,
+                                    "is_warning": False
+                                })
+                                result["error_count"] += 1
+                            elif error_match:
+                                code, msg = error_match.groups()
+                                result["errors"].append({
+                                    "line": None,
+                                    "error_code": code,
+                                    "message": msg.strip(),
+                                    "is_error": True,
+                                    "is_warning": False
+                                })
+                                result["error_count"] += 1
+
+                        elif warning_match:
+                            code, msg = warning_match.groups()
                             result["errors"].append({
                                 "line": None,
                                 "error_code": code,
                                 "message": msg.strip(),
-                                "is_error": True,
-                                "is_warning": False
+                                "is_error": False,
+                                "is_warning": True
                             })
-                            result["error_count"] += 1
-
-                    elif warning_match:
-                        code, msg = warning_match.groups()
-                        result["errors"].append({
-                            "line": None,
-                            "error_code": code,
-                            "message": msg.strip(),
-                            "is_error": False,
-                            "is_warning": True
-                        })
-                        result["warning_count"] += 1
+                            result["warning_count"] += 1
 
             result["status"] = "success"
 
@@ -288,35 +359,32 @@ class MT5LogParser:
 
         try:
             # Calculate cutoff time
-            cutoff_time = datetime.now() - timedelta(hours=hours)
+            now = datetime.now()
+            cutoff_time = now - timedelta(hours=hours)
+            cutoff_key = self._timestamp_key(cutoff_time)
 
             # Read logs from the last few days
-            for day_offset in range(max(hours // 24 + 1, 3)):
-                log_date = (datetime.now() - timedelta(days=day_offset)).strftime("%Y%m%d")
-                journal_path = self.logs_dir / f"{log_date}.log"
-
-                if not journal_path.exists():
-                    continue
+            for journal_path in self._journal_paths(cutoff_time, now):
+                for timestamp_str, message in self._entries_since(journal_path, cutoff_key):
+                    # Cheap reject: MT5 timestamps sort lexicographically
+                    if len(timestamp_str) == 23 and timestamp_str < cutoff_key:
+                        continue
 
-                with open(journal_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        entry = self._parse_log_line(line)
-                        if not entry:
-                            continue
+                    entry = self._make_entry(timestamp_str, message)
 
-                        # Check if entry is after cutoff
-                        try:
-                            entry_time = datetime.fromisoformat(entry["timestamp"])
-                            if entry_time < cutoff_time:
-                                continue
-                        except ValueError:
+                    # Check if entry is after cutoff
+                    try:
+                        entry_time = datetime.fromisoformat(entry["timestamp"])
+                        if entry_time < cutoff_time:
                             continue
+                    except ValueError:
+                        continue
 
-                        # Look for trade patterns
-                        trade = self._extract_trade(entry["message"])
-                        if trade:
-                            trade["time"] = entry["timestamp"]
-                            result["trades"].append(trade)
+                    # Look for trade patterns
+                    trade = self._extract_trade(entry["message"])
+                    if trade:
+                        trade["time"] = entry["timestamp"]
+                        result["trades"].append(trade)
 
             result["status"] = "success"
             result["trade_count"] = len(result["trades"])
@@ -361,31 +429,33 @@ class MT5LogParser:
                 ea_name = ea_name[:-4]
 
             # Calculate cutoff time
-            cutoff_time = datetime.now() - timedelta(hours=hours)
+            now = datetime.now()
+            cutoff_time = now - timedelta(hours=hours)
+            cutoff_key = self._timestamp_key(cutoff_time)
+
+            # The bare-name check compares against the lowercased message, so
+            # it can only match (and is only worth a lower() copy) when the
+            # name itself has no uppercase letters
+            tag = f"[{ea_name}]"
+            match_bare_name = ea_name == ea_name.lower()
 
             # Read logs
-            for day_offset in range(max(hours // 24 + 1, 2)):
-                log_date = (datetime.now() - timedelta(days=day_offset)).strftime("%Y%m%d")
-                journal_path = self.logs_dir / f"{log_date}.log"
-
-                if not journal_path.exists():
-                    continue
-
-                with open(journal_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        # Look for EA section
-                        if f"[{ea_name}]" in line or ea_name in line.lower():
-                            entry = self._parse_log_line(line)
-                            if entry:
-                                try:
-                                    entry_time = datetime.fromisoformat(entry["timestamp"])
-                                    if entry_time >= cutoff_time:
-                                        result["prints"].append({
-                                            "timestamp": entry["timestamp"],
-                                            "message": entry["message"]
-                                        })
-                                except ValueError:
-                                    pass
+            for journal_path in self._journal_paths(cutoff_time, now):
+                for timestamp_str, message in self._entries_since(journal_path, cutoff_key):
+                    # Look for EA section
+                    if tag in message or (match_bare_name and ea_name in message.lower()):
+                        if len(timestamp_str) == 23 and timestamp_str < cutoff_key:
+                            continue
+                        entry = self._make_entry(timestamp_str, message)
+                        try:
+                            entry_time = datetime.fromisoformat(entry["timestamp"])
+                            if entry_time >= cutoff_time:
+                                result["prints"].append({
+                                    "timestamp": entry["timestamp"],
+                                    "message": entry["message"]
+                                })
+                        except ValueError:
+                            pass
 
             result["status"] = "success"
             result["count"] = len(result["prints"])
@@ -400,15 +470,25 @@ class MT5LogParser:
         self,
         callback_fn: Callable,
         filter_keywords: Optional[List[str]] = None,
-        check_interval: float = 0.5
+        check_interval: float = 0.5,
+        batched: bool = False,
+        batch_size: int = 100,
+        batch_ms: float = 50
     ) -> Dict[str, Any]:
         """
         Monitor journal file in real-time.
 
+        Uses a watchdog Observer (OS file-change notifications) when watchdog
+        is installed, otherwise polls the file every check_interval seconds.
+
         Args:
             callback_fn: Function to call for each new entry: callback(entry)
             filter_keywords: Only trigger on lines containing these keywords
-            check_interval: Check interval in seconds
+            check_interval: Check interval in seconds (polling fallback only)
+            batched: Call callback_fn(entries) with a list of entries instead
+                of once per entry
+            batch_size: Max entries per batched call
+            batch_ms: Max milliseconds to accumulate a batch before calling
 
         Returns:
             {
@@ -438,46 +518,105 @@ class MT5LogParser:
                 return result
 
             self.watch_active = True
-            self.last_position[str(journal_path)] = 0
+            journal_key = str(journal_path)
+            self.last_position[journal_key] = 0
 
-            def _watch_loop():
-                """Background watch loop."""
-                while self.watch_active:
-                    try:
-                        # Get current file size
-                        current_size = journal_path.stat().st_size
-                        last_pos = self.last_position.get(str(journal_path), 0)
-
-                        if current_size > last_pos:
-                            # New content added
-                            with open(journal_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                f.seek(last_pos)
-                                new_lines = f.readlines()
-                                self.last_position[str(journal_path)] = f.tell()
-
-                            for line in new_lines:
-                                # Apply keyword filter
-                                if filter_keywords:
-                                    if not any(kw.lower() in line.lower() for kw in filter_keywords):
-                                        continue
-
-                                # Parse and callback
-                                entry = self._parse_log_line(line)
-                                if entry:
-                                    try:
-                                        callback_fn(entry)
-                                    except Exception as e:
-                                        logger.error(f"Callback error: {str(e)}")
-
-                        time.sleep(check_interval)
-
-                    except Exception as e:
-                        logger.error(f"Watch loop error: {str(e)}")
-                        time.sleep(check_interval)
-
-            # Start watch thread
-            self.watch_thread = threading.Thread(target=_watch_loop, daemon=True)
-            self.watch_thread.start()
+            # Keep the journal open for the whole watch; each check is then
+            # just stat + seek + read instead of a fresh open/close
+            self.watch_file = open(journal_path, 'rb', buffering=1 << 20)
+
+            dispatch_lock = threading.Lock()
+
+            def _dispatch_new_lines():
+                """Read lines appended since the last call and run callbacks."""
+                with dispatch_lock:
+                    _read_and_dispatch()
+
+            def _read_and_dispatch():
+                try:
+                    path_stat = os.stat(journal_path)
+                except FileNotFoundError:
+                    return  # Being replaced; pick it up on the next change
+
+                watch_file = self.watch_file
+                last_pos = self.last_position.get(journal_key, 0)
+
+                # Journal replaced (new inode) or truncated: start over
+                if (path_stat.st_ino != os.fstat(watch_file.fileno()).st_ino
+                        or path_stat.st_size < last_pos):
+                    watch_file.close()
+                    watch_file = self.watch_file = open(journal_path, 'rb', buffering=1 << 20)
+                    last_pos = self.last_position[journal_key] = 0
+
+                if path_stat.st_size <= last_pos:
+                    return
+
+                # New content added
+                watch_file.seek(last_pos)
+                data = watch_file.read()
+                self.last_position[journal_key] = watch_file.tell()
+
+                pending = []
+                last_flush = time.monotonic()
+
+                for line_b in data.splitlines(keepends=True):
+                    line = line_b.decode('utf-8', 'ignore')
+                    # Apply keyword filter
+                    if filter_keywords:
+                        if not any(kw.lower() in line.lower() for kw in filter_keywords):
+                            continue
+
+                    # Parse and callback
+                    entry = self._parse_log_line(line)
+                    if not entry:
+                        continue
+
+                    if not batched:
+                        _run_callback(entry)
+                        continue
+
+                    pending.append(entry)
+                    if (len(pending) >= batch_size
+                            or time.monotonic() - last_flush > batch_ms / 1000):
+                        _run_callback(pending)
+                        pending = []
+                        last_flush = time.monotonic()
+
+                # Nothing is held back between reads
+                if pending:
+                    _run_callback(pending)
+
+            def _run_callback(arg):
+                try:
+                    callback_fn(arg)
+                except Exception as e:
+                    logger.error(f"Callback error: {str(e)}")
+
+            if WATCHDOG_AVAILABLE:
+                # Event-driven: sleep until the OS reports the journal changed
+                handler = _JournalEventHandler(journal_path, _dispatch_new_lines)
+                self.watch_observer = Observer()
+                self.watch_observer.schedule(handler, str(self.logs_dir), recursive=False)
+                self.watch_observer.start()
+
+                # Catch up on existing content without waiting for a change
+                self.watch_thread = threading.Thread(target=handler.fire, daemon=True)
+                self.watch_thread.start()
+            else:
+                def _watch_loop():
+                    """Background watch loop (polling fallback)."""
+                    while self.watch_active:
+                        try:
+                            _dispatch_new_lines()
+                            time.sleep(check_interval)
+
+                        except Exception as e:
+                            logger.error(f"Watch loop error: {str(e)}")
+                            time.sleep(check_interval)
+
+                # Start watch thread
+                self.watch_thread = threading.Thread(target=_watch_loop, daemon=True)
+                self.watch_thread.start()
 
             result["status"] = "success"
             result["message"] = "Journal watch started"
@@ -485,6 +624,7 @@ class MT5LogParser:
         except Exception as e:
             result["error"] = str(e)
             self.watch_active = False
+            self._close_watch_file()
 
         return result
 
@@ -505,11 +645,24 @@ class MT5LogParser:
 
         self.watch_active = False
 
+        if self.watch_observer:
+            self.watch_observer.stop()
+            self.watch_observer.join(timeout=2)
+            self.watch_observer = None
+
         if self.watch_thread:
             self.watch_thread.join(timeout=2)
 
+        self._close_watch_file()
+
         return result
 
+    def _close_watch_file(self) -> None:
+        """Close the journal handle held open by watch_journal."""
+        if self.watch_file:
+            self.watch_file.close()
+            self.watch_file = None
+
     def detect_anomalies(self, hours: int = 1) -> Dict[str, Any]:
         """
         Detect error conditions in logs.
@@ -539,52 +692,55 @@ class MT5LogParser:
         }
 
         try:
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-            anomaly_counts = {}
+            now = datetime.now()
+            cutoff_time = now - timedelta(hours=hours)
+            cutoff_key = self._timestamp_key(cutoff_time)
+            candidates = []
 
             # Read logs
-            for day_offset in range(max(hours // 24 + 1, 1)):
-                log_date = (datetime.now() - timedelta(days=day_offset)).strftime("%Y%m%d")
-                journal_path = self.logs_dir / f"{log_date}.log"
-
-                if not journal_path.exists():
-                    continue
+            for journal_path in self._journal_paths(cutoff_time, now):
+                for timestamp_str, message in self._entries_since(journal_path, cutoff_key):
+                    # Cheap reject: MT5 timestamps sort lexicographically
+                    if len(timestamp_str) == 23 and timestamp_str < cutoff_key:
+                        continue
 
-                with open(journal_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        entry = self._parse_log_line(line)
-                        if not entry:
-                            continue
+                    entry = self._make_entry(timestamp_str, message)
 
-                        # Check timestamp
-                        try:
-                            entry_time = datetime.fromisoformat(entry["timestamp"])
-                            if entry_time < cutoff_time:
-                                continue
-                        except ValueError:
+                    # Check timestamp
+                    try:
+                        entry_time = datetime.fromisoformat(entry["timestamp"])
+                        if entry_time < cutoff_time:
                             continue
-
-                        # Check for anomalies
-                        for anomaly_type, pattern in self.ANOMALIES.items():
-                            if pattern.search(entry["message"]):
-                                if anomaly_type not in anomaly_counts:
-                                    anomaly_counts[anomaly_type] = {
-                                        "count": 0,
-                                        "last_message": entry["message"],
-                                        "last_time": entry["timestamp"]
-                                    }
-                                anomaly_counts[anomaly_type]["count"] += 1
-
-            # Format results
-            for anomaly_type, data in anomaly_counts.items():
-                severity = "critical" if data["count"] > 5 else "warning"
+                    except ValueError:
+                        continue
+
+                    candidates.append(entry)
+
+            # Check for anomalies (one scan for all types), counting per
+            # type id and remembering where each type was first seen
+            names = list(self.ANOMALIES)
+            counts = [0] * len(names)
+            first_seen = [None] * len(names)
+            for index, found in enumerate(self._match_anomalies(candidates)):
+                for anomaly_id in found:
+                    if not counts[anomaly_id]:
+                        first_seen[anomaly_id] = index
+                    counts[anomaly_id] += 1
+
+            # Format results (types in order of first appearance)
+            seen_ids = [i for i in range(len(names)) if counts[i]]
+            seen_ids.sort(key=first_seen.__getitem__)
+            for anomaly_id in seen_ids:
+                entry = candidates[first_seen[anomaly_id]]
+                count = counts[anomaly_id]
+                severity = "critical" if count > 5 else "warning"
 
                 result["anomalies"].append({
-                    "type": anomaly_type,
+                    "type": names[anomaly_id],
                     "severity": severity,
-                    "message": data["last_message"],
-                    "timestamp": data["last_time"],
-                    "count": data["count"]
+                    "message": entry["message"],
+                    "timestamp": entry["timestamp"],
+                    "count": count
                 })
 
             result["status"] = "success"
@@ -595,36 +751,301 @@ class MT5LogParser:
 
         return result
 
+    def _match_anomalies(self, entries: List[Dict[str, str]]) -> List[set]:
+        """
+        Return the set of ANOMALY_IDS matched by each entry's message.
+
+        With hyperscan installed, all messages are joined and scanned in a
+        single pass against every pattern, and match offsets are mapped back
+        to entries through a table of line start offsets. Otherwise each
+        message is lowercased once and checked for ANOMALY_LITERALS with
+        plain substring searches, which is much faster than case-insensitive
+        regex matching in CPython.
+        """
+        if not HYPERSCAN_AVAILABLE or not entries:
+            literals = self.ANOMALY_LITERALS
+            found = []
+            for entry in entries:
+                message_lower = entry["message"].lower()
+                found.append({
+                    anomaly_id for anomaly_id, literal in literals
+                    if literal in message_lower
+                })
+            return found
+
+        db = self._get_anomaly_db()
+        scratch = self._get_anomaly_scratch(db)
+        encoded = [entry["message"].encode('utf-8') for entry in entries]
+
+        starts = []
+        offset = 0
+        for message_b in encoded:
+            starts.append(offset)
+            offset += len(message_b) + 1
+
+        found = [set() for _ in entries]
+
+        def on_match(pattern_id, start, end, flags, context):
+            found[bisect_right(starts, end - 1) - 1].add(pattern_id)
+
+        db.scan(b'\n'.join(encoded), match_event_handler=on_match, scratch=scratch)
+        return found
+
+    @classmethod
+    def _get_anomaly_db(cls):
+        """Compile ANOMALIES into a hyperscan block-mode database once."""
+        if cls._anomaly_db is None:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[p.pattern.encode() for p in cls.ANOMALIES.values()],
+                ids=list(range(len(cls.ANOMALIES))),
+                elements=len(cls.ANOMALIES),
+                flags=[hyperscan.HS_FLAG_CASELESS] * len(cls.ANOMALIES)
+            )
+            cls._anomaly_db = db
+        return cls._anomaly_db
+
+    @classmethod
+    def _get_anomaly_scratch(cls, db):
+        """
+        Return this thread's hyperscan scratch space for db.
+
+        A scratch can only be used by one scan at a time, and the database's
+        built-in one is shared by every thread, so each thread gets its own.
+        """
+        local = cls._anomaly_scratch
+        if getattr(local, "db", None) is not db:
+            local.scratch = hyperscan.Scratch(database=db)
+            local.db = db
+        return local.scratch
+
+    @staticmethod
+    @contextmanager
+    def _map_file(path: Path):
+        """
+        Memory-map a log file read-only.
+
+        Yields an mmap object, or b"" for an empty file (which cannot be
+        mapped). Both support len(), slicing, find() and rfind().
+        """
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            size = os.fstat(fd).st_size
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ) if size else None
+        finally:
+            os.close(fd)
+
+        if mm is None:
+            yield b""
+            return
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+    def _read_tail(self, path: Path, lines: int) -> Tuple[List[str], int]:
+        """
+        Return the last N lines of a file and its total line count.
+
+        Memory-maps the file and walks back from the end; if the file can't
+        be mapped, streams it through a bounded deque instead. Either way
+        memory use is proportional to N, not to the file size.
+        """
+        try:
+            with self._map_file(path) as mm:
+                size = len(mm)
+
+                # Walk back from the end to the start of the last N lines
+                end = size - 1 if size and mm[size - 1:size] == b'\n' else size
+                pos = end
+                if lines > 0:
+                    for _ in range(lines):
+                        pos = mm.rfind(b'\n', 0, pos)
+                        if pos < 0:
+                            break
+                    start = pos + 1
+                else:
+                    start = 0
+                tail = mm[start:size].decode('utf-8', 'ignore').split('\n')
+
+                # Count lines in bounded chunks (no full copy of the file)
+                newlines = 0
+                for offset in range(0, size, self._COUNT_CHUNK):
+                    newlines += mm[offset:offset + self._COUNT_CHUNK].count(b'\n')
+                return tail, newlines + (1 if end == size and size else 0)
+
+        except (OSError, ValueError) as e:
+            logger.debug(f"mmap unavailable for {path}, streaming instead: {str(e)}")
+
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            tail = deque(f, maxlen=lines if lines > 0 else None)
+
+        with open(path, 'rb') as f:
+            newlines = 0
+            last = b''
+            for chunk in iter(lambda: f.read(self._COUNT_CHUNK), b''):
+                newlines += chunk.count(b'\n')
+                last = chunk
+        return list(tail), newlines + (1 if last and not last.endswith(b'\n') else 0)
+
+    @staticmethod
+    def _timestamp_key(dt: datetime) -> str:
+        """
+        Format datetime as an MT5 log timestamp ("YYYY.MM.DD HH:MM:SS.mmm").
+
+        Milliseconds are truncated, so any entry whose timestamp string sorts
+        below this key is strictly older than dt.
+        """
+        return dt.strftime("%Y.%m.%d %H:%M:%S.%f")[:-3]
+
+    def _journal_paths(self, cutoff_time: datetime, now: datetime) -> List[Path]:
+        """Return existing daily logs from now's date back to cutoff_time's."""
+        paths = []
+        day = now.date()
+        first_day = cutoff_time.date()
+        log_names = self._daily_log_names()
+        while day >= first_day:
+            name = f"{day.strftime('%Y%m%d')}.log"
+            if os.path.normcase(name) in log_names:
+                paths.append(self.logs_dir / name)
+            day -= timedelta(days=1)
+        return paths
+
+    def _daily_log_names(self) -> set:
+        """
+        Return the normcased names of the .log files in logs_dir.
+
+        The directory is listed once with os.scandir and re-listed only when
+        its mtime changes (a log was created or removed), so looking up a
+        day costs a set probe instead of a stat call.
+        """
+        try:
+            dir_mtime = os.stat(self.logs_dir).st_mtime_ns
+        except FileNotFoundError:
+            return set()
+
+        cached = self._log_names_cache
+        if cached is None or cached[0] != dir_mtime:
+            with os.scandir(self.logs_dir) as it:
+                names = {
+                    os.path.normcase(entry.name) for entry in it
+                    if entry.name.lower().endswith(".log")
+                }
+            cached = self._log_names_cache = (dir_mtime, names)
+        return cached[1]
+
+    def _entries_since(self, path: Path, cutoff_key: str) -> List[Tuple[str, str]]:
+        """
+        Return the entries of a log file, skipping those before cutoff_key.
+
+        When the file's timestamps are uniform and in order, the start is
+        found by binary search; otherwise every entry is returned and the
+        caller's own cutoff check does the filtering.
+        """
+        entries, keys = self._load_entries(path)
+        if keys is None:
+            return entries
+        return entries[bisect_left(keys, cutoff_key):]
+
+    def _load_entries(
+        self,
+        path: Path
+    ) -> Tuple[List[Tuple[str, str]], Optional[List[str]]]:
+        """
+        Return (timestamp, message) pairs for every entry in a log file.
+
+        Also returns the list of timestamps when they are all in the
+        fixed-width MT5 format and non-decreasing (None otherwise), so
+        callers can bisect on them.
+
+        Results are cached per file and reused while its mtime and size are
+        unchanged, so back-to-back calls (e.g. a daily report) scan each
+        file only once.
+        """
+        key = str(path)
+        stat = os.stat(path)
+        cached = self._entry_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            self._entry_cache.move_to_end(key)
+            return cached[2], cached[3]
+
+        entries = [
+            (timestamp_b.decode('ascii'), message_b.decode('utf-8', 'ignore'))
+            for timestamp_b, message_b in self._iter_log_entries(path)
+        ]
+        keys = [timestamp_str for timestamp_str, _ in entries]
+        if (any(len(k) != 23 for k in keys)
+                or any(a > b for a, b in zip(keys, keys[1:]))):
+            keys = None
+
+        self._entry_cache[key] = (stat.st_mtime_ns, stat.st_size, entries, keys)
+        self._entry_cache.move_to_end(key)
+        while len(self._entry_cache) > self.ENTRY_CACHE_SIZE:
+            self._entry_cache.popitem(last=False)
+        return entries, keys
+
+    def _iter_log_entries(self, path: Path):
+        """
+        Yield (timestamp, message) byte pairs for every entry in a log file.
+
+        Runs LOG_ENTRY_PATTERN_B over the whole mapping in one finditer pass
+        instead of reading, decoding and matching line by line.
+        """
+        with self._map_file(path) as mm:
+            for match in self.LOG_ENTRY_PATTERN_B.finditer(mm):
+                yield match.group(1), match.group(2)
+
     def _parse_log_line(self, line: str) -> Optional[Dict[str, str]]:
         """Parse single log line."""
         match = self.LOG_ENTRY_PATTERN.match(line)
         if not match:
             return None
 
-        timestamp_str, message = match.groups()
+        return self._make_entry(*match.groups())
 
-        # Convert timestamp to ISO format
+    @staticmethod
+    def _parse_timestamp(timestamp_str: str) -> Optional[datetime]:
+        """
+        Parse an MT5 timestamp ("YYYY.MM.DD HH:MM:SS.mmm").
+
+        The standard 23-char layout is sliced at fixed offsets straight into
+        the datetime constructor, avoiding strptime's per-call format
+        handling; anything else falls back to strptime.
+        """
         try:
-            dt = datetime.strptime(timestamp_str, "%Y.%m.%d %H:%M:%S.%f")
-            iso_time = dt.isoformat()
+            if len(timestamp_str) == 23:
+                return datetime(
+                    int(timestamp_str[0:4]), int(timestamp_str[5:7]), int(timestamp_str[8:10]),
+                    int(timestamp_str[11:13]), int(timestamp_str[14:16]), int(timestamp_str[17:19]),
+                    int(timestamp_str[20:23]) * 1000
+                )
+            return datetime.strptime(timestamp_str, "%Y.%m.%d %H:%M:%S.%f")
         except ValueError:
-            iso_time = timestamp_str
+            return None
+
+    def _make_entry(self, timestamp_str: str, message: str) -> Dict[str, str]:
+        """Build entry dict from a raw timestamp and message."""
+        # Convert timestamp to ISO format
+        dt = self._parse_timestamp(timestamp_str)
+        iso_time = dt.isoformat() if dt else timestamp_str
 
         # Determine type
-        msg_lower = message.lower()
-        if "error" in msg_lower:
+        type_match = self.TYPE_PATTERN.search(message)
+        if type_match is None:
+            msg_type = "info"
+        elif type_match.group(1) or self.ERROR_WORD_PATTERN.search(message, type_match.end()):
             msg_type = "error"
-        elif "warning" in msg_lower:
-            msg_type = "warning"
         else:
-            msg_type = "info"
+            msg_type = "warning"
 
-        # Extract source
+        # Extract source (system lines usually have no tag at all)
         source = "System"
-        if "[Expert" in message:
-            source = "Expert"
-        elif "[Account" in message:
-            source = "Account"
+        bracket = message.find("[")
+        if bracket != -1:
+            if message.find("[Expert", bracket) != -1:
+                source = "Expert"
+            elif message.find("[Account", bracket) != -1:
+                source = "Account"
 
         return {
             "timestamp": iso_time,
@@ -639,13 +1060,15 @@ class MT5LogParser:
         if not match:
             return None
 
-        action, symbol, volume, _, price = match.groups()
+        action, symbol, volume, price = match.groups()
 
-        # Look for profit
-        profit_match = self.PROFIT_PATTERN.search(message)
+        # Look for profit (most trade lines carry neither keyword)
         profit = None
-        if profit_match:
-            profit = float(profit_match.group(2))
+        msg_lower = message.lower()
+        if "profit" in msg_lower or "loss" in msg_lower:
+            profit_match = self.PROFIT_PATTERN.search(message)
+            if profit_match:
+                profit = float(profit_match.group(2))
 
         return {
             "action": action.upper(),
@@ -690,10 +1113,11 @@ def get_ea_prints(ea_name: str, hours: int = 4) -> Dict[str, Any]:
 
 def watch_journal(
     callback_fn: Callable,
-    filter_keywords: Optional[List[str]] = None
+    filter_keywords: Optional[List[str]] = None,
+    batched: bool = False
 ) -> Dict[str, Any]:
     """Watch journal in real-time."""
-    return _get_parser().watch_journal(callback_fn, filter_keywords)
+    return _get_parser().watch_journal(callback_fn, filter_keywords, batched=batched)
 
 
 def stop_watch() -> Dict[str, Any]:
@@ -4,12 +4,16 @@ from .mt5_manager import (
     MT5Manager,
     get_system_health,
     list_active_bots,
-    switch_account
+    switch_account,
+    get_connection_quality,
+    get_full_status
 )
 
 __all__ = [
     "MT5Manager",
     "get_system_health",
     "list_active_bots",
-    "switch_account"
+    "switch_account",
+    "get_connection_quality",
+    "get_full_status"
 ]
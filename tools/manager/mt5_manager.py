@@ -9,34 +9,164 @@ Imports Phase 1 tools:
 - mt5_scheduler: Session info
 """
 
+import atexit
+import functools
 import logging
+import re
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, NamedTuple, Optional
 
 from tools.process import get_mt5_status, start_mt5
 from tools.notify import send
 from tools.scheduler import get_current_session
 
-try:
-    import MetaTrader5 as mt5
-except ImportError:
-    mt5 = None
-
-try:
-    import win32gui
-    import win32con
-    import win32api
-except ImportError:
-    win32gui = None
+# MetaTrader5 and pywin32 load DLLs on import, so they are imported on
+# first use (see _get_mt5 / _get_win32gui); None means not (yet) available
+mt5 = None
+win32gui = None
+win32process = None
+_mt5_import_attempted = False
+_win32_import_attempted = False
+# Held while importing, so a second thread waits for the first import to
+# finish instead of seeing "attempted" with the module still None
+_import_lock = threading.Lock()
 
 logger = logging.getLogger(__name__)
 
+# Queued (non-blocking) notifications, one per severity used here
+_notify_info = functools.partial(send, severity="info", async_send=True)
+_notify_warning = functools.partial(send, severity="warning", async_send=True)
+_notify_critical = functools.partial(send, severity="critical", async_send=True)
+
+
+class BotInfo(NamedTuple):
+    """One detected chart/bot; stored as-is in caches, dict at the API edge."""
+    chart_id: Optional[int]
+    symbol: str
+    timeframe: str
+    ea_name: str
+    is_active: bool
+    source: str
+
+
+def _get_mt5():
+    """Import MetaTrader5 on first call; returns the module or None."""
+    global mt5, _mt5_import_attempted
+    if mt5 is None and not _mt5_import_attempted:
+        with _import_lock:
+            if not _mt5_import_attempted:
+                try:
+                    import MetaTrader5
+                    mt5 = MetaTrader5
+                except ImportError:
+                    pass
+                _mt5_import_attempted = True
+    return mt5
+
+
+def _get_win32gui():
+    """Import win32gui/win32process on first call; returns win32gui or None."""
+    global win32gui, win32process, _win32_import_attempted
+    if win32gui is None and not _win32_import_attempted:
+        with _import_lock:
+            if not _win32_import_attempted:
+                try:
+                    import win32gui as _win32gui
+                    import win32process as _win32process
+                    win32gui, win32process = _win32gui, _win32process
+                except ImportError:
+                    pass
+                _win32_import_attempted = True
+    return win32gui
+
+
+def _ttl_cache(ttl: float):
+    """
+    Cache a no-argument method's result dict per instance for ttl seconds.
+
+    Results carrying an "error" are not cached, and callers get a shallow
+    copy so they can't alter the cached value.
+    """
+    def decorator(method):
+        attr = f"_ttl_cache_{method.__name__}"
+
+        @functools.wraps(method)
+        def wrapper(self):
+            now = time.monotonic()
+            cached = self.__dict__.get(attr)
+            if cached and now < cached[1]:
+                return dict(cached[0])
+
+            value = method(self)
+            if not value.get("error"):
+                self.__dict__[attr] = (value, now + ttl)
+            return dict(value)
+
+        return wrapper
+    return decorator
+
 
 class MT5Manager:
     """System health monitoring and account management."""
 
+    # Seconds a successful mt5.initialize() is trusted before re-checking
+    MT5_INIT_TTL = 60
+
+    # Seconds a chart window scan is reused before enumerating windows again
+    CHART_CACHE_TTL = 2.0
+
+    # MT5 chart window title: "SYMBOL,TF (EA Name)", mentioning Expert/EA/Bot
+    # Groups: symbol, timeframe, EA name (optional)
+    CHART_TITLE_PATTERN = re.compile(
+        r"(?=.*?(?:Expert|EA|Bot))([^,]*),\s*([^\s,(]*)(?:[^,(]*\(([^,)]*)\))?",
+        re.DOTALL
+    )
+
     def __init__(self):
-        pass
+        self._mt5_initialized = False
+        self._mt5_init_time = 0.0
+        self._mt5_shutdown_registered = False
+        # The MetaTrader5 package talks to the terminal over a single IPC
+        # channel and isn't thread-safe: every mt5.* call holds this lock
+        self._mt5_lock = threading.Lock()
+        self._executor = None
+        self._chart_cache: tuple = ()
+        self._chart_cache_time: Optional[float] = None
+        self._mt5_pid: Optional[int] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Shared pool for running independent status queries in parallel."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mt5-manager")
+        return self._executor
+
+    def _ensure_mt5(self, ttl: Optional[float] = None) -> bool:
+        """
+        Make sure the MT5 API connection is initialized.
+
+        A successful mt5.initialize() is reused for ttl seconds (default
+        MT5_INIT_TTL), so methods chained by get_system_health() don't each
+        pay an IPC round-trip to the terminal.
+        """
+        if not _get_mt5():
+            return False
+
+        ttl = self.MT5_INIT_TTL if ttl is None else ttl
+        with self._mt5_lock:
+            if self._mt5_initialized and time.monotonic() - self._mt5_init_time < ttl:
+                return True
+
+            self._mt5_initialized = bool(mt5.initialize())
+            if not self._mt5_initialized:
+                return False
+
+            self._mt5_init_time = time.monotonic()
+            if not self._mt5_shutdown_registered:
+                atexit.register(mt5.shutdown)
+                self._mt5_shutdown_registered = True
+            return True
 
     def get_system_health(self) -> Dict[str, Any]:
         """
@@ -58,34 +188,44 @@ class MT5Manager:
         }
 
         try:
+            # Process status and session don't touch the MT5 API, so they
+            # run in parallel; the MT5 queries below are serialized anyway
+            executor = self._get_executor()
+            status_future = executor.submit(get_mt5_status)
+            session_future = executor.submit(get_current_session)
+
             # 1. MT5 process status
-            mt5_status = get_mt5_status()
+            mt5_status = status_future.result()
+            self._mt5_pid = mt5_status.get("pid")
             result["mt5_running"] = mt5_status.get("is_running", False)
             result["mt5_responsive"] = mt5_status.get("is_responsive", False)
 
             if not result["mt5_running"]:
+                # Nothing MT5-side can answer; skip the init attempt and
+                # bot scan and report just the (local) market session
                 result["status"] = "critical"
                 result["issues"].append("MT5 is not running")
-            elif not result["mt5_responsive"]:
+                self._apply_session(result, session_future.result())
+                return result
+            if not result["mt5_responsive"]:
                 result["status"] = "degraded"
                 result["issues"].append("MT5 is running but not responding")
 
+            # 4. Active bots
+            bots = self.list_active_bots()
+
             # 2. Market session
-            session_info = get_current_session()
-            sessions = session_info.get("sessions", [])
-            result["current_session"] = ", ".join(sessions) if sessions else "Off-market"
-            result["is_market_open"] = len(sessions) > 0
+            self._apply_session(result, session_future.result())
 
             # 3. Account health (if MT5 connected)
-            if result["mt5_running"] and mt5:
+            if _get_mt5():
                 account = self._get_account_health()
                 result["account_health"] = account
-                if account.get("margin_level_percent", 100) < 150:
+                margin_level = account.get("margin_level_percent", 100)
+                if margin_level < 150:
                     result["status"] = "critical"
-                    result["issues"].append(f"Low margin level: {account.get('margin_level_percent', 0):.0f}%")
+                    result["issues"].append(f"Low margin level: {margin_level:.0f}%")
 
-            # 4. Active bots count
-            bots = self.list_active_bots()
             result["active_bots"] = len(bots.get("bots", []))
 
         except Exception as e:
@@ -95,14 +235,62 @@ class MT5Manager:
 
         return result
 
+    @staticmethod
+    def _apply_session(result: Dict[str, Any], session_info: Dict[str, Any]) -> None:
+        """Fill current_session/is_market_open from get_current_session()."""
+        sessions = session_info.get("sessions", [])
+        result["current_session"] = ", ".join(sessions) if sessions else "Off-market"
+        result["is_market_open"] = len(sessions) > 0
+
+    def get_full_status(self) -> Dict[str, Any]:
+        """
+        Health, active bots and connection quality in one call.
+
+        The health check runs first. When MT5 is not running, bots and
+        connection come back empty without touching the MT5 API, since
+        mt5.initialize() could launch the terminal. Otherwise the
+        connection check runs on the worker pool while the bots are listed
+        here (their MT5 API calls still take turns on _mt5_lock), all on
+        the one MT5 initialization. With pywin32 the bots list reuses the
+        chart scan the health check just took; the positions/orders
+        fallback queries again. Dashboards that need all three should use
+        this instead of calling them separately.
+
+        Returns:
+            {health: <get_system_health>, bots: <list_active_bots>,
+             connection: <get_connection_quality>}
+        """
+        health = self.get_system_health()
+        if not health["mt5_running"]:
+            return {
+                "health": health,
+                "bots": {"status": "error", "bots": [], "error": "MT5 is not running"},
+                "connection": {
+                    "status": "error",
+                    "ping_ms": None,
+                    "is_connected": False,
+                    "bars_available": 0,
+                    "error": "MT5 is not running"
+                }
+            }
+
+        connection_future = self._get_executor().submit(self.get_connection_quality)
+        return {
+            "health": health,
+            "bots": self.list_active_bots(),
+            "connection": connection_future.result()
+        }
+
+    @_ttl_cache(0.5)
     def _get_account_health(self) -> Dict[str, Any]:
         """Get account health metrics via MT5 API."""
         health = {}
         try:
-            if not mt5.initialize():
+            if not self._ensure_mt5():
                 return {"error": "MT5 not connected"}
 
-            info = mt5.account_info()
+            with self._mt5_lock:
+                info = mt5.account_info()
             if info:
                 margin_level = (info.equity / info.margin * 100) if info.margin > 0 else 9999
                 health = {
@@ -123,6 +311,11 @@ class MT5Manager:
             health = {"error": str(e)}
         return health
 
+    def _clear_ttl_caches(self) -> None:
+        """Drop results memoized by _ttl_cache (e.g. after an account switch)."""
+        for attr in [a for a in self.__dict__ if a.startswith("_ttl_cache_")]:
+            del self.__dict__[attr]
+
     def list_active_bots(self) -> Dict[str, Any]:
         """
         List all EAs currently attached to charts.
@@ -139,49 +332,43 @@ class MT5Manager:
         }
 
         try:
-            if not mt5:
+            if not _get_mt5():
                 result["error"] = "MetaTrader5 library not installed"
                 return result
 
-            if not mt5.initialize():
+            if not self._ensure_mt5():
                 result["error"] = "MT5 not connected"
                 return result
 
-            # Get all symbols with open positions (proxy for active charts)
-            positions = mt5.positions_get()
-            symbols_with_positions = set()
-            if positions:
-                for pos in positions:
-                    symbols_with_positions.add(pos.symbol)
-
-            # Get active orders too
-            orders = mt5.orders_get()
-            if orders:
-                for order in orders:
-                    symbols_with_positions.add(order.symbol)
-
-            # Check terminal info for EA activity
-            terminal_info = mt5.terminal_info()
             bots = []
 
             # MT5 doesn't expose chart EA info directly via API
             # Use win32gui to scan window titles as fallback
-            if win32gui:
+            if _get_win32gui():
                 bots = self._scan_charts_win32()
             else:
-                # Fallback: report symbols with open positions as "active"
+                # Fallback: report symbols with open positions/orders as
+                # "active" (proxy for active charts)
+                with self._mt5_lock:
+                    positions = mt5.positions_get()
+                    orders = mt5.orders_get()
+                symbols_with_positions = (
+                    {pos.symbol for pos in positions or ()}
+                    | {order.symbol for order in orders or ()}
+                )
+
                 for symbol in symbols_with_positions:
-                    bots.append({
-                        "chart_id": None,
-                        "symbol": symbol,
-                        "timeframe": "Unknown",
-                        "ea_name": "Active (position open)",
-                        "is_active": True,
-                        "source": "positions"
-                    })
+                    bots.append(BotInfo(
+                        chart_id=None,
+                        symbol=symbol,
+                        timeframe="Unknown",
+                        ea_name="Active (position open)",
+                        is_active=True,
+                        source="positions"
+                    ))
 
             result["status"] = "success"
-            result["bots"] = bots
+            result["bots"] = [bot._asdict() for bot in bots]
             logger.info(f"Found {len(bots)} active charts/bots")
 
         except Exception as e:
@@ -190,33 +377,61 @@ class MT5Manager:
 
         return result
 
-    def _scan_charts_win32(self) -> List[Dict]:
-        """Scan MT5 window titles to detect charts and EAs."""
-        bots = []
+    def _scan_charts_win32(self) -> List[BotInfo]:
+        """
+        Scan MT5 window titles to detect charts and EAs.
 
-        def enum_handler(hwnd, ctx):
-            if win32gui.IsWindowVisible(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                # MT5 chart windows have format: "SYMBOL,TF (EA Name)"
-                if "," in title and ("Expert" in title or "EA" in title or "Bot" in title):
-                    parts = title.split(",")
-                    symbol = parts[0].strip()
-                    rest = parts[1] if len(parts) > 1 else ""
-                    # Extract timeframe and EA name
-                    tf_match = rest.split(" ")[0] if rest else "M1"
-                    ea_match = rest[rest.find("(")+1:rest.find(")")] if "(" in rest else "Unknown"
-                    bots.append({
-                        "chart_id": hwnd,
-                        "symbol": symbol,
-                        "timeframe": tf_match,
-                        "ea_name": ea_match,
-                        "is_active": True,
-                        "source": "win32"
-                    })
-
-        win32gui.EnumWindows(enum_handler, None)
+        Chart windows rarely change, so a scan is reused for CHART_CACHE_TTL
+        seconds instead of enumerating every top-level window on each call
+        (BotInfo entries are immutable, so the cache is shared as-is).
+        """
+        if (self._chart_cache_time is not None
+                and time.monotonic() - self._chart_cache_time < self.CHART_CACHE_TTL):
+            return list(self._chart_cache)
+
+        # Only look at the terminal's own windows when its PID is known
+        # (from the last get_system_health); skips GetWindowText elsewhere
+        mt5_pid = self._mt5_pid if win32process else None
+        bots = self._enum_chart_windows(mt5_pid)
+        if not bots and mt5_pid:
+            # No charts is the usual idle state, but the terminal may also
+            # have restarted under a new PID; rescan only if it did
+            current_pid = get_mt5_status().get("pid")
+            if current_pid and current_pid != mt5_pid:
+                self._mt5_pid = current_pid
+                bots = self._enum_chart_windows(current_pid)
+
+        self._chart_cache = tuple(bots)
+        self._chart_cache_time = time.monotonic()
+        return bots
+
+    def _enum_chart_windows(self, mt5_pid: Optional[int]) -> List[BotInfo]:
+        """Enumerate top-level windows (of mt5_pid, if given) that are charts."""
+        bots = []
+        win32gui.EnumWindows(self._on_enum_window, (bots, mt5_pid, self.CHART_TITLE_PATTERN))
         return bots
 
+    @staticmethod
+    def _on_enum_window(hwnd, ctx) -> None:
+        """EnumWindows callback: append a bot entry for each chart window."""
+        bots, mt5_pid, title_pattern = ctx
+        if mt5_pid and win32process.GetWindowThreadProcessId(hwnd)[1] != mt5_pid:
+            return
+        if win32gui.IsWindowVisible(hwnd):
+            title = win32gui.GetWindowText(hwnd)
+            # MT5 chart windows have format: "SYMBOL,TF (EA Name)"
+            match = title_pattern.match(title)
+            if match:
+                symbol, timeframe, ea_name = match.groups()
+                bots.append(BotInfo(
+                    chart_id=hwnd,
+                    symbol=symbol.strip(),
+                    timeframe=timeframe or "M1",
+                    ea_name=ea_name if ea_name is not None else "Unknown",
+                    is_active=True,
+                    source="win32"
+                ))
+
     def switch_account(
         self,
         account_id: int,
@@ -243,30 +458,45 @@ class MT5Manager:
         }
 
         try:
-            if not mt5:
+            if not _get_mt5():
                 result["error"] = "MetaTrader5 library not installed"
                 return result
 
             # Initialize MT5
-            if not mt5.initialize():
+            if not self._ensure_mt5():
                 result["error"] = "Failed to initialize MT5"
                 return result
 
             # Login to new account
             logger.info(f"Switching to account {account_id} on {server}")
-            login_result = mt5.login(account_id, password=password, server=server)
+            self._clear_ttl_caches()
+            with self._mt5_lock:
+                login_result = mt5.login(account_id, password=password, server=server)
+                error_code = None if login_result else mt5.last_error()
 
             if not login_result:
-                error_code = mt5.last_error()
                 result["error"] = f"Login failed: {error_code}"
-                send(f"❌ Account switch failed: {account_id} | Error: {error_code}", severity="critical")
+                _notify_critical(f"❌ Account switch failed: {account_id} | Error: {error_code}")
                 return result
 
-            # Wait for connection to stabilize
-            time.sleep(2)
+            # Wait until the terminal reports the new account connected,
+            # polling instead of sleeping a fixed worst case (bounded by timeout)
+            get_account_info, get_terminal_info = mt5.account_info, mt5.terminal_info
+            deadline = time.perf_counter() + timeout
+            while True:
+                with self._mt5_lock:
+                    account_info = get_account_info()
+                    connected = False
+                    if account_info and account_info.login == account_id:
+                        terminal_info = get_terminal_info()
+                        connected = bool(terminal_info and terminal_info.connected)
+                if connected:
+                    break
+                if time.perf_counter() >= deadline:
+                    break
+                time.sleep(0.05)
 
             # Verify connection
-            account_info = mt5.account_info()
             if account_info and account_info.login == account_id:
                 result["status"] = "success"
                 result["account_info"] = {
@@ -280,28 +510,29 @@ class MT5Manager:
                 }
                 is_demo = result["account_info"]["is_demo"]
                 acct_type = "DEMO" if is_demo else "REAL"
-                send(
-                    f"✅ Switched to {acct_type} account {account_id} | Balance: {account_info.balance:.2f} {account_info.currency}",
-                    severity="info"
+                _notify_info(
+                    f"✅ Switched to {acct_type} account {account_id} | Balance: {account_info.balance:.2f} {account_info.currency}"
                 )
                 logger.info(f"Successfully switched to {acct_type} account {account_id}")
             else:
                 result["error"] = "Login appeared to succeed but account verification failed"
-                send(f"⚠️ Account switch verification failed: {account_id}", severity="warning")
+                _notify_warning(f"⚠️ Account switch verification failed: {account_id}")
 
         except Exception as e:
             result["error"] = str(e)
             logger.error(f"switch_account error: {str(e)}")
-            send(f"❌ Account switch error: {str(e)}", severity="critical")
+            _notify_critical(f"❌ Account switch error: {str(e)}")
 
         return result
 
+    @_ttl_cache(0.5)
     def get_connection_quality(self) -> Dict[str, Any]:
         """
         Check MT5 connection quality to broker.
 
         Returns:
             {status, ping_ms, is_connected, bars_available, error}
+            bars_available is 1 if the latest M1 bar could be fetched, else 0
         """
         result = {
             "status": "error",
@@ -312,18 +543,20 @@ class MT5Manager:
         }
 
         try:
-            if not mt5 or not mt5.initialize():
+            if not self._ensure_mt5():
                 result["error"] = "MT5 not connected"
                 return result
 
-            terminal_info = mt5.terminal_info()
+            with self._mt5_lock:
+                terminal_info = mt5.terminal_info()
+                # Check data availability (XAUUSDm M1); one bar is enough to tell
+                rates = mt5.copy_rates_from_pos("XAUUSDm", mt5.TIMEFRAME_M1, 0, 1)
+
             if terminal_info:
                 result["is_connected"] = terminal_info.connected
                 result["ping_ms"] = getattr(terminal_info, "ping_last", None)
 
-            # Check data availability (XAUUSDm M1)
-            rates = mt5.copy_rates_from_pos("XAUUSDm", mt5.TIMEFRAME_M1, 0, 10)
-            result["bars_available"] = len(rates) if rates is not None else 0
+            result["bars_available"] = 1 if rates is not None and len(rates) else 0
             result["status"] = "success"
 
         except Exception as e:
@@ -334,13 +567,18 @@ class MT5Manager:
 
 # Module-level singleton
 _manager = None
+_manager_lock = threading.Lock()
 
 
 def _get_manager() -> MT5Manager:
     global _manager
-    if not _manager:
-        _manager = MT5Manager()
-    return _manager
+    manager = _manager
+    if manager is None:
+        with _manager_lock:
+            manager = _manager
+            if manager is None:
+                manager = _manager = MT5Manager()
+    return manager
 
 
 def get_system_health() -> Dict[str, Any]:
@@ -363,6 +601,11 @@ def get_connection_quality() -> Dict[str, Any]:
     return _get_manager().get_connection_quality()
 
 
+def get_full_status() -> Dict[str, Any]:
+    """Get health, active bots and connection quality together."""
+    return _get_manager().get_full_status()
+
+
 if __name__ == "__main__":
     print("MT5 Manager Tool (Phase 2)")
     health = get_system_health()
@@ -7,7 +7,7 @@ Supports: Telegram, Line Notify, Discord, Email
 Uses requests library for HTTP APIs
 Threading for non-blocking async sends
 
-Dependencies: requests
+Dependencies: requests (orjson used for JSON if installed)
 """
 
 import os
@@ -15,19 +15,38 @@ import json
 import time
 import logging
 import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Union
 from datetime import datetime
-from queue import Queue
 from enum import Enum
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     requests = None
+    HTTPAdapter = None
+    Retry = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Outbound JSON bodies: orjson encodes straight to bytes when available
+if orjson:
+    _json_dumps = orjson.dumps
+else:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class Severity(Enum):
     """Severity levels for notifications."""
@@ -52,6 +71,27 @@ class Severity(Enum):
         return NotImplemented
 
 
+# Lowercase name -> int level; hot paths compare ints, not Enum members
+_SEVERITY_LEVELS = {sev.name.lower(): sev.value for sev in Severity}
+
+
+class _QueuedMessage:
+    """One async send waiting for the worker."""
+    __slots__ = ("message", "severity", "channels", "timestamp")
+
+    def __init__(self, message: str, severity: str, channels: Sequence[str], timestamp: datetime):
+        self.message = message
+        self.severity = severity
+        self.channels = channels
+        self.timestamp = timestamp
+
+# Queued by stop_worker(); the worker exits when it pops this
+_POISON = object()
+
+# Parsed settings files: path -> (mtime_ns, size, config)
+_config_cache: Dict[str, tuple] = {}
+
+
 class MT5Notifier:
     """
     Unified notification gateway for MT5 events.
@@ -73,12 +113,49 @@ class MT5Notifier:
         "crashed": "💥",
     }
 
+    # Trade action -> (emoji, severity); other actions get (info, "info")
+    TRADE_ACTIONS = {
+        "BUY": (EMOJI["buy"], "info"),
+        "SELL": (EMOJI["sell"], "info"),
+        "CLOSE": (EMOJI["close"], "warning"),
+    }
+
+    # Bot status -> severity; anything else is "info"
+    BOT_STATUS_SEVERITY = {
+        "crashed": "critical",
+        "error": "warning",
+    }
+
     # Telegram API
     TELEGRAM_API = "https://api.telegram.org/bot{token}/sendMessage"
 
     # Line Notify API
     LINE_NOTIFY_API = "https://notify-api.line.me/api/notify"
 
+    # Admission at send(): the same message to the same channel within
+    # DEDUP_WINDOW seconds is dropped, as is anything past
+    # MAX_MESSAGES_PER_MINUTE per channel. The worker then caps actual posts
+    # at RATE_LIMIT_PER_MINUTE per channel; messages over that are held and
+    # merged into the next grouped post rather than dropped (at most
+    # QUEUE_CAPACITY held per channel). Critical messages bypass all three.
+    DEDUP_WINDOW = 5.0
+    MAX_MESSAGES_PER_MINUTE = 120
+    RATE_LIMIT_PER_MINUTE = 20
+
+    # Queued messages arriving within COALESCE_WINDOW seconds of each other
+    # go out together: joined into one Telegram message (char limit), or as
+    # up to DISCORD_MAX_EMBEDS embeds on one Discord webhook call
+    COALESCE_WINDOW = 0.2
+    GROUP_LIMITS = {"telegram": 4096}
+    GROUP_SEPARATOR = "\n---\n"
+    DISCORD_MAX_EMBEDS = 10
+    DISCORD_MAX_EMBED_CHARS = 6000
+
+    # Most async sends held for the worker; past this, non-critical sends
+    # are dropped (counted as suppressed["queue_full"]) instead of growing
+    # the queue without bound while a channel is down
+    QUEUE_CAPACITY = 10000
+
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize MT5 Notifier.
@@ -87,10 +164,34 @@ class MT5Notifier:
             config_path: Path to notify_settings.json
         """
         self.config = self._load_config(config_path)
-        self.send_queue = Queue()
+        self._recompute_cached()
+        # Single consumer (the worker), so a deque + wake event is enough;
+        # append/popleft are atomic and skip Queue's lock/Condition per put
+        self.send_queue = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._recent: Dict[tuple, float] = {}
+        self._message_times: Dict[str, deque] = {}
+        self._filter_lock = threading.Lock()
+        self._rate_buckets: Dict[str, List[float]] = {}
+        self._carry: Dict[str, List[tuple]] = {}  # worker only
+        self.suppressed = Counter()
+        self._sessions: Dict[str, Any] = {}
+        self._sessions_lock = threading.Lock()
+        self._executor = None
+        self._channel_pending: Dict[str, deque] = {}
+        self._channel_futures: Dict[str, Any] = {}
+        self._channel_lock = threading.Lock()
+        self._smtp = None
+        self._smtp_key = None
+        self._smtp_lock = threading.Lock()
         self.worker_thread = None
         self.worker_active = False
-        self._start_worker()
+        self._worker_lock = threading.Lock()
+        # Nothing configured to send to: don't start a thread until an
+        # async send names a channel explicitly
+        if not self._noop:
+            self._start_worker()
 
     def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
         """Load notification configuration."""
@@ -100,17 +201,78 @@ class MT5Notifier:
             # Try default location
             path = Path(__file__).parent.parent.parent / "config" / "notify_settings.json"
 
-        if not path.exists():
+        try:
+            stat = path.stat()
+        except OSError:
             logger.warning(f"Config not found: {path}, using defaults")
             return self._default_config()
 
+        # Re-parse only when the file changed; callers get their own copy
+        # since set_min_severity() and friends mutate it
+        key = str(path)
+        cached = _config_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return self._copy_config(cached[2])
+
         try:
-            with open(path, 'r') as f:
-                return json.load(f)
+            data = path.read_bytes()
+            config = orjson.loads(data) if orjson else json.loads(data)
         except Exception as e:
             logger.error(f"Error loading config: {str(e)}")
             return self._default_config()
 
+        _config_cache[key] = (stat.st_mtime_ns, stat.st_size, config)
+        return self._copy_config(config)
+
+    @staticmethod
+    def _copy_config(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy the config dict and its per-channel sections."""
+        return {
+            key: dict(value) if isinstance(value, dict) else
+            list(value) if isinstance(value, list) else value
+            for key, value in config.items()
+        }
+
+    def _recompute_cached(self):
+        """Refresh values send() reads on every call; run after config changes."""
+        self._min_severity = Severity[self.config.get("min_severity", "info").upper()]
+        self._min_level = self._min_severity.value
+        self._enabled_channels = tuple(self.config.get("enabled_channels", ("telegram",)))
+        self._noop = not any(self._channel_configured(ch) for ch in self._enabled_channels)
+        self._compile_endpoints()
+
+    def _compile_endpoints(self):
+        """Build the per-channel URLs and headers once per config (None if unset)."""
+        telegram = self.config.get("telegram", {})
+        token = telegram.get("bot_token", "")
+        chat_id = telegram.get("chat_id", "")
+        self._telegram_url = self.TELEGRAM_API.format(token=token) if token and chat_id else None
+        self._telegram_chat_id = chat_id
+
+        line_token = self.config.get("line", {}).get("token", "")
+        self._line_headers = {
+            "Authorization": f"Bearer {line_token}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        } if line_token else None
+
+        self._discord_url = self.config.get("discord", {}).get("webhook_url", "") or None
+
+    def _channel_configured(self, channel: str) -> bool:
+        """True if channel has the credentials its sender requires."""
+        channel_lower = channel.lower()
+        config = self.config.get(channel_lower, {})
+        if channel_lower == "telegram":
+            return bool(config.get("bot_token") and config.get("chat_id"))
+        if channel_lower == "line":
+            return bool(config.get("token"))
+        if channel_lower == "discord":
+            return bool(config.get("webhook_url"))
+        if channel_lower == "email":
+            return all(config.get(key) for key in (
+                "smtp_server", "sender_email", "sender_password", "recipient_email"
+            ))
+        return False
+
     @staticmethod
     def _default_config() -> Dict[str, Any]:
         """Return default configuration."""
@@ -140,7 +302,7 @@ class MT5Notifier:
     def send(
         self,
         message: str,
-        severity: str = "info",
+        severity: Union[str, Severity] = "info",
         channel: Optional[str] = None,
         async_send: bool = True
     ) -> Dict[str, Any]:
@@ -149,7 +311,7 @@ class MT5Notifier:
 
         Args:
             message: Message to send
-            severity: "debug", "info", "warning", "critical"
+            severity: "debug", "info", "warning", "critical" (or a Severity)
             channel: Send to specific channel (or None for all enabled)
             async_send: Send asynchronously if True
 
@@ -158,52 +320,83 @@ class MT5Notifier:
                 "status": "queued" | "skipped" | "error",
                 "sent_to": [],
                 "failed": [],
+                "suppressed": [],        # channels dropped as duplicate/rate-limited
                 "message": str,
                 "error": str | None
             }
         """
+        if self._noop and not channel:
+            return {
+                "status": "skipped",
+                "sent_to": [],
+                "failed": [],
+                "suppressed": [],
+                "message": "No enabled channel is configured",
+                "error": None
+            }
+
         result = {
             "status": "skipped",
             "sent_to": [],
             "failed": [],
+            "suppressed": [],
             "message": "",
             "error": None
         }
 
         try:
             # Check severity filter
-            min_sev = Severity[self.config.get("min_severity", "info").upper()]
-            msg_sev = Severity[severity.upper()]
-
-            if msg_sev < min_sev:
-                result["message"] = f"Message severity {severity} below minimum {min_sev.name}"
+            if isinstance(severity, Severity):
+                level = severity.value
+                severity = severity.name.lower()
+            else:
+                level = _SEVERITY_LEVELS.get(severity)
+                if level is None:
+                    # Queue the canonical name; the worker compares it as-is
+                    severity = severity.lower()
+                    level = _SEVERITY_LEVELS[severity]
+
+            if level < self._min_level:
+                result["message"] = f"Message severity {severity} below minimum {self._min_severity.name}"
                 return result
 
             # Get target channels
             if channel:
-                channels = [channel]
+                channels = (channel,)
             else:
-                channels = self.config.get("enabled_channels", ["telegram"])
+                channels = self._enabled_channels
+
+            channels = self._admit(message, level, channels, result["suppressed"])
+            if not channels:
+                result["message"] = "Suppressed (duplicate or rate limited)"
+                return result
 
             # Queue for async sending or send directly
+            if async_send and self.worker_thread is None:
+                self._start_worker()
             if async_send and self.worker_active:
-                self.send_queue.put({
-                    "message": message,
-                    "severity": severity,
-                    "channels": channels,
-                    "timestamp": datetime.now()
-                })
+                if len(self.send_queue) >= self.QUEUE_CAPACITY and level < Severity.CRITICAL.value:
+                    with self._filter_lock:
+                        self.suppressed["queue_full"] += 1
+                    result["message"] = "Send queue full"
+                    return result
+                self.send_queue.append(
+                    _QueuedMessage(message, severity, channels, datetime.now())
+                )
+                self._wake.set()
                 result["status"] = "queued"
                 result["message"] = f"Queued to {', '.join(channels)}"
             else:
-                # Send synchronously
+                # Send synchronously (channels in parallel)
+                errors = self._run_per_channel(
+                    lambda ch: self._send_to_channel(message, ch, severity), channels
+                )
                 for ch in channels:
-                    try:
-                        self._send_to_channel(message, ch, severity)
+                    if errors[ch] is None:
                         result["sent_to"].append(ch)
-                    except Exception as e:
+                    else:
                         result["failed"].append(ch)
-                        logger.error(f"Error sending to {ch}: {str(e)}")
+                        logger.error(f"Error sending to {ch}: {str(errors[ch])}")
 
                 result["status"] = "success" if result["sent_to"] else "error"
                 result["message"] = f"Sent to {', '.join(result['sent_to'])}"
@@ -242,32 +435,22 @@ class MT5Notifier:
         """
         # Determine emoji and severity
         action_upper = action.upper()
-        if action_upper == "BUY":
-            emoji = self.EMOJI["buy"]
-            severity = "info"
-        elif action_upper == "SELL":
-            emoji = self.EMOJI["sell"]
-            severity = "info"
-        elif action_upper == "CLOSE":
-            emoji = self.EMOJI["close"]
-            severity = "warning"
-            if profit and profit > 0:
-                emoji = self.EMOJI["profit"]
-        else:
-            emoji = self.EMOJI["info"]
-            severity = "info"
+        emoji, severity = self.TRADE_ACTIONS.get(action_upper, (self.EMOJI["info"], "info"))
+        if action_upper == "CLOSE" and profit and profit > 0:
+            emoji = self.EMOJI["profit"]
 
         # Build message
-        message = f"{emoji} {action_upper} {symbol}"
+        parts = [f"{emoji} {action_upper} {symbol}"]
         if volume > 0:
-            message += f" | {volume} lot"
+            parts.append(f" | {volume} lot")
         if entry_price:
-            message += f" | Entry: {entry_price:.2f}"
+            parts.append(f" | Entry: {entry_price:.2f}")
         if profit is not None:
             profit_icon = self.EMOJI["profit"] if profit > 0 else self.EMOJI["loss"]
-            message += f" | {profit_icon} {profit:+.2f}"
+            parts.append(f" | {profit_icon} {profit:+.2f}")
         if comment:
-            message += f" | {comment}"
+            parts.append(f" | {comment}")
+        message = "".join(parts)
 
         return self.send(message, severity=severity, channel=channel)
 
@@ -306,11 +489,13 @@ class MT5Notifier:
         emoji = self.EMOJI["profit"] if total_profit > 0 else self.EMOJI["loss"]
 
         # Build message
-        message = f"📊 DAILY REPORT - {date}\n\n"
-        message += f"{emoji} Total P/L: {total_profit:+.2f}\n"
-        message += f"📈 Trades: {trade_count} ({wins}W / {losses}L)\n"
-        message += f"🎯 Win Rate: {win_rate:.1f}%\n"
-        message += f"📉 Max Drawdown: {max_drawdown:.2f}%"
+        message = (
+            f"📊 DAILY REPORT - {date}\n\n"
+            f"{emoji} Total P/L: {total_profit:+.2f}\n"
+            f"📈 Trades: {trade_count} ({wins}W / {losses}L)\n"
+            f"🎯 Win Rate: {win_rate:.1f}%\n"
+            f"📉 Max Drawdown: {max_drawdown:.2f}%"
+        )
 
         severity = "warning" if total_profit < 0 else "info"
         return self.send(message, severity=severity, channel=channel)
@@ -334,10 +519,8 @@ class MT5Notifier:
         Returns:
             {status, sent_to, failed, message}
         """
-        message = f"{self.EMOJI['error']} ERROR | {source}\n"
-        if ea_name:
-            message += f"EA: {ea_name}\n"
-        message += f"Message: {error_message}"
+        ea_line = f"EA: {ea_name}\n" if ea_name else ""
+        message = f"{self.EMOJI['error']} ERROR | {source}\n{ea_line}Message: {error_message}"
 
         return self.send(message, severity="critical", channel=channel)
 
@@ -362,11 +545,11 @@ class MT5Notifier:
         """
         status_lower = status.lower()
         emoji = self.EMOJI.get(status_lower, self.EMOJI["info"])
-        severity = "critical" if status_lower == "crashed" else "warning" if status_lower == "error" else "info"
+        severity = self.BOT_STATUS_SEVERITY.get(status_lower, "info")
 
         message = f"{emoji} {status.upper()} | {ea_name}"
         if details:
-            message += f"\n{details}"
+            message = f"{message}\n{details}"
 
         return self.send(message, severity=severity, channel=channel)
 
@@ -388,54 +571,98 @@ class MT5Notifier:
         else:
             raise ValueError(f"Unknown channel: {channel}")
 
-    def _send_telegram(self, message: str):
-        """Send via Telegram."""
-        config = self.config.get("telegram", {})
-        token = config.get("bot_token", "")
-        chat_id = config.get("chat_id", "")
+    def _get_session(self, channel: str):
+        """
+        Keep-alive HTTP session for a channel, created on first use.
 
-        if not token or not chat_id:
+        Reusing the pooled connection saves a TCP + TLS handshake on every
+        notification after the first. Only connection failures (the request
+        never reached the server) are retried by the adapter; a POST that got
+        a response, even a 5xx, is not resent, since the API may already have
+        delivered it and a retry would duplicate the alert.
+        """
+        session = self._sessions.get(channel)
+        if session is not None:
+            return session
+
+        with self._sessions_lock:
+            session = self._sessions.get(channel)
+            if session is None:
+                session = requests.Session()
+                retry = Retry(
+                    total=2,
+                    connect=2,
+                    read=0,
+                    status=0,
+                    backoff_factor=0.3,
+                    respect_retry_after_header=False
+                )
+                session.mount("https://", HTTPAdapter(
+                    pool_connections=4, pool_maxsize=8, max_retries=retry
+                ))
+                self._sessions[channel] = session
+        return session
+
+    def _close_sessions(self):
+        """Close all pooled HTTP sessions."""
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def _send_telegram(self, message: str, html: bool = False):
+        """
+        Send via Telegram.
+
+        Messages go out as plain text unless html=True; plain text skips
+        Telegram's HTML parse and can't be rejected for a stray "<" or "&".
+        """
+        url = self._telegram_url
+        if not url:
             raise ValueError("Telegram token or chat_id not configured")
 
-        url = self.TELEGRAM_API.format(token=token)
         payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "HTML"
+            "chat_id": self._telegram_chat_id,
+            "text": message
         }
+        if html:
+            payload["parse_mode"] = "HTML"
 
-        response = requests.post(url, json=payload, timeout=5)
+        response = self._get_session("telegram").post(
+            url, data=_json_dumps(payload), headers=_JSON_HEADERS, timeout=5
+        )
         if response.status_code != 200:
             raise Exception(f"Telegram API error: {response.text}")
 
     def _send_line(self, message: str):
         """Send via Line Notify."""
-        config = self.config.get("line", {})
-        token = config.get("token", "")
-
-        if not token:
+        headers = self._line_headers
+        if not headers:
             raise ValueError("Line token not configured")
 
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-        payload = {"message": message}
-
-        response = requests.post(self.LINE_NOTIFY_API, headers=headers, data=payload, timeout=5)
+        response = self._get_session("line").post(
+            self.LINE_NOTIFY_API, headers=headers, data={"message": message}, timeout=5
+        )
         if response.status_code != 200:
             raise Exception(f"Line API error: {response.text}")
 
-    def _send_discord(self, message: str):
-        """Send via Discord."""
-        config = self.config.get("discord", {})
-        webhook_url = config.get("webhook_url", "")
-
+    def _send_discord(self, message: Union[str, Sequence[str]]):
+        """Send via Discord (a batch of messages goes out as one embed each)."""
+        webhook_url = self._discord_url
         if not webhook_url:
             raise ValueError("Discord webhook URL not configured")
 
-        payload = {"content": message}
-        response = requests.post(webhook_url, json=payload, timeout=5)
+        if isinstance(message, str):
+            payload = {"content": message}
+        else:
+            payload = {"embeds": [{"description": text} for text in message]}
+        response = self._get_session("discord").post(
+            webhook_url, data=_json_dumps(payload), headers=_JSON_HEADERS, timeout=5
+        )
         if response.status_code not in [200, 204]:
             raise Exception(f"Discord API error: {response.text}")
 
@@ -463,45 +690,334 @@ class MT5Notifier:
         msg["From"] = sender
         msg["To"] = recipient
 
-        # Send
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
+        # Send on the kept-open connection; if the server dropped it since
+        # the last email, log in again once and retry
+        key = (smtp_server, smtp_port, sender, password)
+        with self._smtp_lock:
+            try:
+                self._get_smtp(smtplib, key).send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self._close_smtp()
+                self._get_smtp(smtplib, key).send_message(msg)
+
+    def _get_smtp(self, smtplib, key: tuple):
+        """
+        Logged-in SMTP connection for key (server, port, sender, password).
+
+        Connect + STARTTLS + AUTH happen once per connection rather than per
+        email. Caller must hold _smtp_lock.
+        """
+        if self._smtp is not None and self._smtp_key == key:
+            return self._smtp
+
+        self._close_smtp()
+        smtp_server, smtp_port, sender, password = key
+        server = smtplib.SMTP(smtp_server, smtp_port, timeout=10)
+        try:
             server.starttls()
             server.login(sender, password)
-            server.send_message(msg)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        self._smtp_key = key
+        return server
+
+    def _close_smtp(self):
+        """Best-effort QUIT of the kept-open SMTP connection."""
+        server, self._smtp, self._smtp_key = self._smtp, None, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
 
     def _start_worker(self):
         """Start background worker thread."""
-        if self.worker_active:
-            return
+        with self._worker_lock:
+            if self.worker_active:
+                return
 
-        self.worker_active = True
-        self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self.worker_thread.start()
+            self.worker_active = True
+            self._stop.clear()
+            self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+            self.worker_thread.start()
 
     def _worker_loop(self):
-        """Background worker loop for async sending."""
-        while self.worker_active:
-            try:
-                item = self.send_queue.get(timeout=1.0)
-
-                for channel in item["channels"]:
+        """Background worker loop for async sending (sleeps until woken)."""
+        while not self._stop.is_set():
+            # Clear before draining so an append racing with the drain
+            # leaves the event set for the next pass. Held (rate-limited)
+            # messages are retried once a token has had time to refill
+            self._wake.wait(60.0 / self.RATE_LIMIT_PER_MINUTE if self._carry else None)
+            self._wake.clear()
+            # Give a burst a moment to finish so it ships as one batch
+            self._stop.wait(self.COALESCE_WINDOW)
+
+            if self._carry and not self.send_queue:
+                try:
+                    self._send_batch([])
+                except Exception as e:
+                    logger.error(f"Error in notifier worker: {str(e)}")
+
+            while self.send_queue:
+                items = []
+                stopping = False
+                for _ in range(len(self.send_queue)):
+                    item = self.send_queue.popleft()
+                    if item is _POISON:
+                        stopping = True
+                        break
+                    items.append(item)
+
+                if items:
                     try:
-                        self._send_to_channel(
-                            item["message"],
-                            channel,
-                            item.get("severity", "info")
-                        )
+                        self._send_batch(items)
                     except Exception as e:
-                        logger.error(f"Error sending to {channel}: {str(e)}")
+                        logger.error(f"Error in notifier worker: {str(e)}")
+                if stopping:
+                    return
 
-            except Exception:
-                pass
+    def _admit(
+        self,
+        message: str,
+        level: int,
+        channels: Sequence[str],
+        suppressed: List[str]
+    ) -> tuple:
+        """
+        Drop channels for which message is a recent duplicate or which are
+        over MAX_MESSAGES_PER_MINUTE; critical messages always pass.
+
+        Returns:
+            The channels still to send to (dropped ones go into suppressed)
+        """
+        if level >= Severity.CRITICAL.value:
+            return tuple(channels)
+
+        now = time.monotonic()
+        message_hash = hash(message)
+        admitted = []
+
+        with self._filter_lock:
+            for ch in channels:
+                key = (ch, message_hash)
+                last = self._recent.get(key)
+                if last is not None and now - last < self.DEDUP_WINDOW:
+                    self.suppressed["duplicate"] += 1
+                    suppressed.append(ch)
+                    continue
+
+                times = self._message_times.get(ch)
+                if times is None:
+                    times = self._message_times[ch] = deque()
+                while times and now - times[0] > 60.0:
+                    times.popleft()
+                if len(times) >= self.MAX_MESSAGES_PER_MINUTE:
+                    self.suppressed["rate_limited"] += 1
+                    suppressed.append(ch)
+                    continue
+
+                times.append(now)
+                self._recent[key] = now
+                admitted.append(ch)
+
+            if len(self._recent) > 256:
+                self._recent = {
+                    k: t for k, t in self._recent.items() if now - t < self.DEDUP_WINDOW
+                }
+
+        return tuple(admitted)
+
+    def _send_batch(self, items: List[_QueuedMessage]):
+        """
+        Group and rate-limit one drained batch, then hand it to the pool.
+
+        Messages held back by the rate limit last time go first; whatever is
+        over the limit this time is held again for the next batch.
+        """
+        now = time.monotonic()
+        by_channel: Dict[str, List[tuple]] = self._carry
+        self._carry = {}
+
+        for item in items:
+            for channel in item.channels:
+                by_channel.setdefault(channel, []).append((item.message, item.severity))
+
+        outgoing: Dict[str, List[tuple]] = {}
+        for channel, messages in by_channel.items():
+            channel_lower = channel.lower()
+            if channel_lower == "discord":
+                groups = self._group_messages(
+                    messages, self.DISCORD_MAX_EMBED_CHARS, self.DISCORD_MAX_EMBEDS, 0
+                )
+            elif channel_lower in self.GROUP_LIMITS:
+                groups = self._group_messages(messages, self.GROUP_LIMITS[channel_lower])
+            else:
+                groups = [([message], severity) for message, severity in messages]
+
+            start = 0
+            for texts, severity in groups:
+                end = start + len(texts)
+                if severity != "critical" and not self._take_rate_token(channel, now):
+                    self._carry.setdefault(channel, []).extend(messages[start:end])
+                elif channel_lower == "discord":
+                    message = texts[0] if len(texts) == 1 else tuple(texts)
+                    outgoing.setdefault(channel, []).append((message, severity))
+                else:
+                    message = self.GROUP_SEPARATOR.join(texts)
+                    outgoing.setdefault(channel, []).append((message, severity))
+                start = end
+
+            held = self._carry.get(channel)
+            if held and len(held) > self.QUEUE_CAPACITY:
+                with self._filter_lock:
+                    self.suppressed["rate_limited"] += len(held) - self.QUEUE_CAPACITY
+                del held[:len(held) - self.QUEUE_CAPACITY]
+
+        for channel, messages in outgoing.items():
+            self._enqueue_channel(channel, messages)
+
+    def _enqueue_channel(self, channel: str, messages: List[tuple]):
+        """
+        Queue (message, severity) pairs for one channel on the pool.
+
+        Each channel has at most one drain task in flight, so its messages
+        stay in order, while a slow channel never holds up the others or the
+        worker's next batch.
+        """
+        with self._channel_lock:
+            pending = self._channel_pending.get(channel)
+            if pending is None:
+                pending = self._channel_pending[channel] = deque()
+            pending.extend(messages)
+
+            future = self._channel_futures.get(channel)
+            if future is None or future.done():
+                self._channel_futures[channel] = self._get_executor().submit(
+                    self._drain_channel, channel
+                )
+
+    def _drain_channel(self, channel: str):
+        """Pool task: send a channel's pending messages until none are left."""
+        pending = self._channel_pending[channel]
+        while True:
+            with self._channel_lock:
+                if not pending:
+                    # Forget ourselves under the lock so _enqueue_channel
+                    # starts a new drain for anything added after this
+                    self._channel_futures.pop(channel, None)
+                    return
+                message, severity = pending.popleft()
+            try:
+                self._send_to_channel(message, channel, severity)
+            except Exception as e:
+                logger.error(f"Error sending to {channel}: {str(e)}")
+
+    def _run_per_channel(self, func, channels: Sequence[str]) -> Dict[str, Optional[Exception]]:
+        """
+        Call func(channel) for each channel, concurrently when there is more
+        than one, so a multi-channel send costs the slowest round-trip
+        rather than the sum of them.
+
+        Returns:
+            {channel: exception raised, or None}
+        """
+        errors: Dict[str, Optional[Exception]] = {}
+        if len(channels) <= 1:
+            for ch in channels:
+                try:
+                    func(ch)
+                    errors[ch] = None
+                except Exception as e:
+                    errors[ch] = e
+            return errors
+
+        futures = {ch: self._get_executor().submit(func, ch) for ch in channels}
+        for ch, future in futures.items():
+            errors[ch] = future.exception()
+        return errors
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the channel send pool (config "worker_threads", default 4)."""
+        if self._executor is None:
+            with self._sessions_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(1, int(self.config.get("worker_threads", 4))),
+                        thread_name_prefix="mt5-notify"
+                    )
+        return self._executor
+
+    def _group_messages(
+        self,
+        messages: List[tuple],
+        limit: int,
+        max_items: Optional[int] = None,
+        separator_len: Optional[int] = None
+    ) -> List[tuple]:
+        """
+        Pack (message, severity) pairs, in order, into as few groups as fit.
+
+        A group holds at most max_items messages whose lengths (plus one
+        separator between each) total at most limit chars; a message longer
+        than limit gets a group of its own.
+
+        Returns:
+            [(texts, severity), ...] with the highest severity in each group
+        """
+        if separator_len is None:
+            separator_len = len(self.GROUP_SEPARATOR)
+
+        grouped = []
+        texts, size, severity = [], 0, None
+        for message, sev in messages:
+            if texts and size + separator_len + len(message) <= limit and \
+                    (max_items is None or len(texts) < max_items):
+                texts.append(message)
+                size += separator_len + len(message)
+                if _SEVERITY_LEVELS[severity.lower()] < _SEVERITY_LEVELS[sev.lower()]:
+                    severity = sev
+                continue
+            if texts:
+                grouped.append((texts, severity))
+            texts, size, severity = [message], len(message), sev
+        if texts:
+            grouped.append((texts, severity))
+        return grouped
+
+    def _take_rate_token(self, channel: str, now: float) -> bool:
+        """Token bucket per channel: RATE_LIMIT_PER_MINUTE pushes per 60s."""
+        capacity = float(self.RATE_LIMIT_PER_MINUTE)
+        bucket = self._rate_buckets.get(channel)
+        if bucket is None:
+            bucket = self._rate_buckets[channel] = [capacity, now]
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * capacity / 60.0)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1.0
+        return True
 
     def stop_worker(self):
-        """Stop background worker."""
+        """Stop background worker (after it sends what is already queued)."""
         self.worker_active = False
-        if self.worker_thread:
+        self._stop.set()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.send_queue.append(_POISON)
+            self._wake.set()
             self.worker_thread.join(timeout=2)
+        with self._channel_lock:
+            in_flight = list(self._channel_futures.values())
+        if in_flight:
+            wait(in_flight, timeout=2)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._close_sessions()
+        with self._smtp_lock:
+            self._close_smtp()
 
     def test_connection(self, channel: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -527,7 +1043,7 @@ class MT5Notifier:
             if channel:
                 channels = [channel]
             else:
-                channels = self.config.get("enabled_channels", ["telegram"])
+                channels = self._enabled_channels
 
             test_message = "🔔 MT5 Notifier Test Message"
 
@@ -548,11 +1064,12 @@ class MT5Notifier:
 
     def get_enabled_channels(self) -> List[str]:
         """Get list of enabled notification channels."""
-        return self.config.get("enabled_channels", ["telegram"])
+        return list(self._enabled_channels)
 
     def set_min_severity(self, severity: str):
         """Set minimum severity filter."""
         self.config["min_severity"] = severity.lower()
+        self._recompute_cached()
 
     def __del__(self):
         """Cleanup on destruction."""
@@ -561,14 +1078,19 @@ class MT5Notifier:
 
 # Convenience module-level functions
 _mt5_notifier = None
+_notifier_lock = threading.Lock()
 
 
 def _get_notifier(config_path: Optional[str] = None) -> MT5Notifier:
     """Get or create MT5Notifier instance."""
     global _mt5_notifier
-    if not _mt5_notifier:
-        _mt5_notifier = MT5Notifier(config_path)
-    return _mt5_notifier
+    notifier = _mt5_notifier
+    if notifier is None:
+        with _notifier_lock:
+            notifier = _mt5_notifier
+            if notifier is None:
+                notifier = _mt5_notifier = MT5Notifier(config_path)
+    return notifier
 
 
 def send(
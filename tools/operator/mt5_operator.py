@@ -11,6 +11,7 @@ Imports Phase 1 tools:
 """
 
 import logging
+import threading
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
@@ -43,7 +44,13 @@ class MT5Operator:
         self.account_info = mt5.account_info()
         logger.info(f"Connected to MT5 account {self.account_info.login}")
 
-    def get_open_positions(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+    # Field order of the per-position dicts / columns
+    POSITION_FIELDS = (
+        "ticket", "symbol", "action", "volume", "entry_price", "current_price",
+        "profit", "pnl_percent", "open_time", "comment"
+    )
+
+    def get_open_positions(self, symbol: Optional[str] = None, columns: bool = False) -> Dict[str, Any]:
         """
         Get all open positions.
 
@@ -51,6 +58,9 @@ class MT5Operator:
 
         Args:
             symbol: Filter by symbol (optional)
+            columns: Return "positions" as {field: [values...]} (one list per
+                     field, same fields as below) instead of a dict per
+                     position; cheaper for large accounts
 
         Returns:
             {
@@ -75,7 +85,7 @@ class MT5Operator:
         """
         result = {
             "status": "error",
-            "positions": [],
+            "positions": {field: [] for field in self.POSITION_FIELDS} if columns else [],
             "total_pnl": 0.0,
             "error": None
         }
@@ -87,25 +97,36 @@ class MT5Operator:
                 result["status"] = "success"
                 return result
 
+            if columns:
+                result["positions"], result["total_pnl"] = self._position_columns(positions)
+                result["status"] = "success"
+                return result
+
             total_pnl = 0.0
+            append = result["positions"].append
+            fromtimestamp = datetime.fromtimestamp
 
             for pos in positions:
-                symbol_info = mt5.symbol_info(pos.symbol)
-                current_price = symbol_info.bid if pos.type == 0 else symbol_info.ask
+                # positions_get() already carries the closing-side quote
+                # (bid for BUY, ask for SELL); no per-symbol round-trip
+                current_price = pos.price_current
+                price_open = pos.price_open
+                volume = pos.volume
+                is_buy = pos.type == 0
 
-                pnl = (current_price - pos.price_open) * pos.volume * (1 if pos.type == 0 else -1)
-                pnl_percent = (pnl / (pos.price_open * pos.volume)) * 100
+                move = current_price - price_open if is_buy else price_open - current_price
+                pnl = move * volume
 
-                result["positions"].append({
+                append({
                     "ticket": pos.ticket,
                     "symbol": pos.symbol,
-                    "action": "BUY" if pos.type == 0 else "SELL",
-                    "volume": pos.volume,
-                    "entry_price": pos.price_open,
+                    "action": "BUY" if is_buy else "SELL",
+                    "volume": volume,
+                    "entry_price": price_open,
                     "current_price": current_price,
                     "profit": pnl,
-                    "pnl_percent": pnl_percent,
-                    "open_time": datetime.fromtimestamp(pos.time).isoformat(),
+                    "pnl_percent": move / price_open * 100,
+                    "open_time": fromtimestamp(pos.time).isoformat(),
                     "comment": pos.comment
                 })
 
@@ -120,6 +141,39 @@ class MT5Operator:
 
         return result
 
+    def _position_columns(self, positions) -> tuple:
+        """
+        Build get_open_positions' fields column-wise: one list per field,
+        no per-position dict.
+
+        Returns:
+            ({field: [values...]}, total_pnl)
+        """
+        fromtimestamp = datetime.fromtimestamp
+        is_buy = [pos.type == 0 for pos in positions]
+        entry = [pos.price_open for pos in positions]
+        current = [pos.price_current for pos in positions]
+        volume = [pos.volume for pos in positions]
+        move = [
+            c - o if buy else o - c
+            for buy, o, c in zip(is_buy, entry, current)
+        ]
+        profit = [m * v for m, v in zip(move, volume)]
+
+        columns = {
+            "ticket": [pos.ticket for pos in positions],
+            "symbol": [pos.symbol for pos in positions],
+            "action": ["BUY" if buy else "SELL" for buy in is_buy],
+            "volume": volume,
+            "entry_price": entry,
+            "current_price": current,
+            "profit": profit,
+            "pnl_percent": [m / o * 100 for m, o in zip(move, entry)],
+            "open_time": [fromtimestamp(pos.time).isoformat() for pos in positions],
+            "comment": [pos.comment for pos in positions],
+        }
+        return columns, sum(profit)
+
     def close_all_positions(
         self,
         symbol: Optional[str] = None,
@@ -138,7 +192,7 @@ class MT5Operator:
             {
                 "status": "success" | "error",
                 "closed_count": int,
-                "total_pnl": float,
+                "total_pnl": float,              # realized P&L of the close deals
                 "closed_positions": [],
                 "error": str | None
             }
@@ -158,6 +212,8 @@ class MT5Operator:
                 result["status"] = "success"
                 return result
 
+            realized_pnl = 0.0
+
             for pos in positions:
                 # Close position
                 request = {
@@ -175,17 +231,24 @@ class MT5Operator:
                     result["closed_count"] += 1
                     result["closed_positions"].append(pos.symbol)
 
+                    # order_send() carries no P&L; read it from the close deal
+                    profit = self._deal_profit(result_trade.deal)
+                    if profit is None:
+                        # Deal not in history yet: floating profit at close
+                        profit = pos.profit or 0.0
+                    realized_pnl += profit
+
                     # Notify
                     send_trade_alert(
                         "CLOSE",
                         pos.symbol,
                         volume=pos.volume,
+                        profit=profit,
                         comment=comment
                     )
 
             result["status"] = "success"
-            final_positions = self.get_open_positions()
-            result["total_pnl"] = final_positions.get("total_pnl", 0.0)
+            result["total_pnl"] = realized_pnl
 
             # Send alert
             if result["closed_count"] > 0:
@@ -198,6 +261,17 @@ class MT5Operator:
 
         return result
 
+    @staticmethod
+    def _deal_profit(deal_ticket: int) -> Optional[float]:
+        """Realized P&L (profit + swap + commission) of a deal, None if not found."""
+        if not deal_ticket:
+            return None
+        deals = mt5.history_deals_get(ticket=deal_ticket)
+        if not deals:
+            return None
+        deal = deals[0]
+        return deal.profit + deal.swap + deal.commission
+
     def get_account_summary(self) -> Dict[str, Any]:
         """
         Get account statistics.
@@ -227,14 +301,17 @@ class MT5Operator:
             info = mt5.account_info()
 
             if info:
-                margin_percent = (info.margin / info.account_equity * 100) if info.account_equity > 0 else 0
-                drawdown = ((info.account_equity - info.balance) / info.balance * 100) if info.balance > 0 else 0
+                equity = info.equity
+                balance = info.balance
+                margin = info.margin
+                margin_percent = (margin / equity * 100) if equity > 0 else 0
+                drawdown = ((equity - balance) / balance * 100) if balance > 0 else 0
 
                 result["account"] = {
                     "login": info.login,
-                    "balance": info.balance,
-                    "equity": info.account_equity,
-                    "margin": info.margin,
+                    "balance": balance,
+                    "equity": equity,
+                    "margin": margin,
                     "free_margin": info.margin_free,
                     "margin_percent": margin_percent,
                     "drawdown_percent": drawdown
@@ -249,19 +326,24 @@ class MT5Operator:
 
 # Module functions
 _operator = None
+_operator_lock = threading.Lock()
 
 
 def _get_operator() -> MT5Operator:
     """Get or create MT5Operator instance."""
     global _operator
-    if not _operator:
-        _operator = MT5Operator()
-    return _operator
+    operator = _operator
+    if operator is None:
+        with _operator_lock:
+            operator = _operator
+            if operator is None:
+                operator = _operator = MT5Operator()
+    return operator
 
 
-def get_open_positions(symbol: Optional[str] = None) -> Dict[str, Any]:
+def get_open_positions(symbol: Optional[str] = None, columns: bool = False) -> Dict[str, Any]:
     """Get open positions."""
-    return _get_operator().get_open_positions(symbol)
+    return _get_operator().get_open_positions(symbol, columns)
 
 
 def close_all_positions(symbol: Optional[str] = None, comment: str = "emergency") -> Dict[str, Any]:
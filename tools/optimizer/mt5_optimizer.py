@@ -9,15 +9,27 @@ Imports Phase 1 tools:
 - mt5_notifier: Notify on optimization complete
 """
 
+import csv
 import json
 import os
+import copy
+import shutil
+import heapq
+import queue
+import hashlib
 import re
 import time
+import uuid
+import tempfile
+import statistics
 import logging
-import configparser
+import threading
 import subprocess
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
@@ -25,24 +37,184 @@ from tools.files import MT5FileManager
 from tools.process import MT5ProcessControl, get_mt5_status
 from tools.notify import send
 
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.config import get_config
+
+try:
+    import optuna
+except ImportError:
+    optuna = None
+
 logger = logging.getLogger(__name__)
 
 
+class _NotifyBatcher:
+    """Collect notifier lines and send them as one message on exit."""
+
+    def __init__(self, severity: str = "info"):
+        self.severity = severity
+        self.lines: List[str] = []
+
+    def add(self, line: str):
+        self.lines.append(line)
+
+    def flush(self):
+        lines, self.lines = self.lines, []
+        if lines:
+            send("\n".join(lines), severity=self.severity)
+
+    def __enter__(self) -> "_NotifyBatcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+
 class MT5Optimizer:
     """Parameter optimization with walk-forward testing."""
 
+    # Parsed optimization results are kept under the main terminal's
+    # data_path/CACHE_DIR_NAME (shared by all walk-forward workers), one
+    # JSON file per (EA, symbol, dates, ranges, criterion); set
+    # MT5_WFO_CACHE=0 to bypass
+    CACHE_DIR_NAME = ".wfo_cache"
+
+    # sampler="tpe"/"nsga2": Optuna picks points and MT5 runs single
+    # backtests instead of its full-grid optimizer
+    SAMPLED_TRIALS = 200
+    TPE_STARTUP_TRIALS = 20
+
+    # Tester model for optimization runs: 1 = 1-minute OHLC (faster)
+    OPTIMIZATION_MODEL = 1
+
+    # Result columns that are metrics, not EA inputs (CSV and XML names)
+    RESULT_METRIC_COLUMNS = (
+        "Pass", "Result", "Trades", "Profit", "DD%", "Equity DD %",
+        "Expected Payoff", "Profit Factor", "Recovery Factor",
+        "Sharpe Ratio", "Custom",
+    )
+
     def __init__(self):
         self.file_manager = MT5FileManager()
         self.process_control = MT5ProcessControl()
 
-        import sys
-        sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-        from config.config import get_config
         _cfg = get_config()
 
         self.mt5_exe   = _cfg.terminal_exe
         self.data_path = _cfg.data_path
         self.cfg       = _cfg
+        self.portable  = False
+        self._tester   = None
+
+        # Backtests on the main terminal run one at a time
+        self._backtest_lock = threading.Lock()
+
+    def _portable_workers(self) -> List["MT5Optimizer"]:
+        """
+        One optimizer per terminal in optimization.parallel_terminals.
+
+        Each entry is a portable MT5 install (terminal64.exe started with
+        /portable keeps its data, Tester cache and ini files in its own
+        folder). When any are configured they run the windows instead of
+        the main terminal: its optimization and backtest paths stop
+        whichever MT5 window they find first, which could be a worker's.
+        """
+        workers = []
+        for terminal_dir in getattr(self.cfg, "wf_terminals", None) or []:
+            worker = copy.copy(self)
+            worker.data_path = Path(terminal_dir)
+            worker.mt5_exe = worker.data_path / self.mt5_exe.name
+            worker.portable = True
+            worker._tester = None
+            workers.append(worker)
+        return workers
+
+    @staticmethod
+    def _ea_files(experts_dir: Path, ea_name: str) -> List[Path]:
+        """The EA's .mq5 and .ex5 paths under experts_dir (existing or not)."""
+        base = experts_dir / ea_name
+        stem = base.name[:-4] if base.suffix.lower() in (".mq5", ".ex5") else base.name
+        return [
+            base.parent / (stem + ext)
+            for ext in (MT5FileManager.EA_EXTENSION, MT5FileManager.COMPILED_EXTENSION)
+        ]
+
+    def _install_ea(self, ea_name: str):
+        """
+        Copy the main terminal's EA build into this portable terminal.
+
+        Results are cached under the main terminal's EA version, so every
+        worker has to run that same build. copy2 keeps the mtime, so files
+        that already match are left alone on the next run.
+        """
+        if not self.portable:
+            return
+        sources = self._ea_files(self.file_manager.experts_dir, ea_name)
+        targets = self._ea_files(self.data_path / MT5FileManager.EXPERTS_DIR, ea_name)
+        for source, target in zip(sources, targets):
+            try:
+                src_stat = source.stat()
+            except OSError:
+                continue
+            try:
+                dst_stat = target.stat()
+                if (dst_stat.st_mtime_ns, dst_stat.st_size) == (src_stat.st_mtime_ns, src_stat.st_size):
+                    continue
+            except OSError:
+                pass
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+
+    def _backtest(
+        self,
+        ea_name: str,
+        symbol: str,
+        date_from: str,
+        date_to: str,
+        set_path: Path,
+        timeout: int
+    ) -> Dict[str, Any]:
+        """Single backtest on this optimizer's own terminal."""
+        from tools.tester import MT5Tester, run_backtest
+        if not self.portable:
+            with self._backtest_lock:
+                return run_backtest(
+                    ea_name, symbol, 1, date_from, date_to,
+                    set_file=str(set_path), timeout=timeout
+                )
+        if self._tester is None:
+            self._tester = MT5Tester(portable_path=self.data_path)
+        return self._tester.run_backtest(
+            ea_name, symbol, 1, date_from, date_to,
+            set_file=str(set_path), timeout=timeout
+        )
+
+    def _backtest_params(
+        self,
+        ea_name: str,
+        symbol: str,
+        date_from: str,
+        date_to: str,
+        params: Dict,
+        tag: str,
+        timeout: int
+    ) -> Dict[str, Any]:
+        """_backtest() with params written to a .set file that is deleted afterwards."""
+        set_path = self._write_params_set_file(ea_name, params, tag)
+        try:
+            return self._backtest(ea_name, symbol, date_from, date_to, set_path, timeout)
+        finally:
+            self._remove_quietly(set_path)
+
+    @staticmethod
+    def _remove_quietly(path: Path):
+        """Delete path if it exists; a leftover file is not worth an error."""
+        try:
+            path.unlink()
+        except OSError:
+            pass
 
     def _write_optimization_ini(
         self,
@@ -53,127 +225,352 @@ class MT5Optimizer:
         date_to: str,
         param_ranges: Dict[str, Tuple],
         criterion: int = 0
-    ) -> Path:
+    ) -> Tuple[Path, Path]:
         """
         Write optimization .ini config.
 
         param_ranges: {"param_name": (min, max, step)}
         criterion: 0=Balance max, 1=Drawdown min, 2=ProfitFactor, 3=Sharpe
+
+        Returns (ini_path, report_path); the report path is unique per
+        run so parallel windows never read each other's results.
         """
         # Sanitize ea_name for filename (replace path separators)
         safe_ea_name = ea_name.replace("\\", "_").replace("/", "_")
         ini_path = self.data_path / f"optimize_{safe_ea_name}_{symbol}.ini"
+        report_path = self.data_path / f"report_{safe_ea_name}_{symbol}_{uuid.uuid4().hex[:8]}.xml"
+
+        # MT5's INI is flat key=value; build it directly like the tester does
+        lines = [
+            "[Tester]",
+            f"Expert={ea_name}",
+            f"Symbol={symbol}",
+            f"Period={timeframe}",
+            f"Optimization=1",                     # Enable optimization
+            f"OptimizationCriterion={criterion}",
+            f"Model={self.OPTIMIZATION_MODEL}",
+            f"FromDate={date_from}",
+            f"ToDate={date_to}",
+            f"ForwardMode=0",
+            f"Deposit={self.cfg.deposit}",
+            f"Currency={self.cfg.currency}",
+            f"Leverage={self.cfg.leverage}",
+            f"Report={report_path.relative_to(self.data_path)}",  # relative to data_path
+            f"ReplaceReport=1",
+            f"ShutdownTerminal=1",                 # exit when done so wait() returns
+            "",
+            "[TesterInputs]",
+        ]
+
+        # Param ranges, format: "param_name=value||min||max||step||enabled"
+        lines.extend(
+            f"{param}={min_val}||{min_val}||{max_val}||{step}||1"
+            for param, (min_val, max_val, step) in param_ranges.items()
+        )
 
-        config = configparser.ConfigParser()
-        config["Tester"] = {
-            "Expert": ea_name,
-            "Symbol": symbol,
-            "Period": str(timeframe),
-            "Optimization": "1",           # Enable optimization
-            "OptimizationCriterion": str(criterion),
-            "Model": "1",                  # 1-min OHLC (faster)
-            "FromDate": date_from,
-            "ToDate": date_to,
-            "ForwardMode": "0",
-            "Deposit": str(self.cfg.deposit),
-            "Currency": self.cfg.currency,
-            "Leverage": str(self.cfg.leverage),
-        }
-
-        # Write param ranges to [TesterInputs] section
-        config["TesterInputs"] = {}
-        for param, (min_val, max_val, step) in param_ranges.items():
-            # Format: "param_name=value||min||max||step||enabled"
-            config["TesterInputs"][param] = f"{min_val}||{min_val}||{max_val}||{step}||1"
-
-        with open(ini_path, "w") as f:
-            config.write(f)
+        ini_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
         logger.info(f"Wrote optimization ini: {ini_path}")
-        return ini_path
+        return ini_path, report_path
 
-    def _parse_optimization_results(self) -> List[Dict]:
+    def _parse_optimization_results(
+        self,
+        top_n: Optional[int] = None,
+        report_path: Optional[Path] = None,
+        not_before: Optional[float] = None
+    ) -> Tuple[List[Dict], int]:
         """
         Parse optimization results from MT5 cache.
-        MT5 saves results as XML/CSV in Tester folder.
+        MT5 saves results as XML/CSV in Tester folder; when the INI named
+        a report_path and MT5 wrote it, that file is read directly.
+        Otherwise the newest Tester file is used, but only if it was
+        modified at or after not_before (a timestamp), so a file left by
+        an earlier run or another EA is never taken for this one.
+
+        With top_n, only the best top_n rows by profit factor are kept
+        (bounded heap over the row stream); otherwise all rows in file
+        order. Returns (results, total row count).
         """
         results = []
+        total = 0
         tester_path = self.data_path / "Tester"
 
-        # Look for optimization cache files
-        cache_files = sorted(
-            tester_path.glob("*.xml") if tester_path.exists() else [],
-            key=lambda f: f.stat().st_mtime,
-            reverse=True
-        )
-
-        if not cache_files:
-            # Try CSV format
-            cache_files = sorted(
-                tester_path.glob("*.csv") if tester_path.exists() else [],
-                key=lambda f: f.stat().st_mtime,
-                reverse=True
-            )
-
-        if not cache_files:
+        # Newest optimization cache file, XML first then CSV
+        result_file = None
+        if report_path is not None and report_path.is_file():
+            result_file = report_path
+        elif tester_path.exists():
+            result_file = self._newest_result_file(tester_path)
+            if result_file is not None and not_before is not None:
+                try:
+                    if result_file.stat().st_mtime < not_before:
+                        logger.warning(f"Ignoring stale optimization results: {result_file}")
+                        result_file = None
+                except OSError:
+                    result_file = None
+
+        if result_file is None:
             logger.warning("No optimization result files found")
-            return results
+            return results, total
 
-        result_file = cache_files[0]
         logger.info(f"Parsing optimization results: {result_file}")
 
-        try:
-            with open(result_file, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-
-            # Simple CSV parse (MT5 optimization results are CSV)
-            lines = content.strip().split("\n")
-            if len(lines) < 2:
-                return results
+        counter = [0]
 
-            headers = [h.strip() for h in lines[0].split(",")]
-
-            for line in lines[1:]:
-                values = [v.strip() for v in line.split(",")]
-                if len(values) == len(headers):
-                    row = dict(zip(headers, values))
-                    try:
-                        results.append({
-                            "params": {k: v for k, v in row.items()
-                                       if k not in ("Result", "Trades", "Profit", "DD%")},
-                            "profit_factor": float(row.get("Profit Factor", 0) or 0),
-                            "net_profit": float(row.get("Profit", 0) or 0),
-                            "drawdown": float(row.get("DD%", 0) or 0),
-                            "total_trades": int(row.get("Trades", 0) or 0),
-                        })
-                    except (ValueError, KeyError):
-                        continue
+        def counted(rows):
+            for row in rows:
+                counter[0] += 1
+                yield row
 
+        try:
+            rows = counted(self._iter_result_rows(result_file))
+            if top_n is None:
+                results = list(rows)
+            else:
+                results = heapq.nlargest(top_n, rows, key=lambda r: r["profit_factor"])
         except Exception as e:
             logger.error(f"Error parsing optimization results: {str(e)}")
 
-        return results
+        return results, counter[0]
+
+    @staticmethod
+    def _newest_result_file(tester_path: Path) -> Optional[Path]:
+        """
+        Newest *.xml in tester_path, else newest *.csv, in one scandir
+        pass (DirEntry.stat() comes from the directory listing on Windows).
+        """
+        newest = {".xml": (None, -1.0), ".csv": (None, -1.0)}
+        with os.scandir(tester_path) as entries:
+            for entry in entries:
+                # Same matching as glob: no dotfiles, OS case rules
+                ext = os.path.splitext(os.path.normcase(entry.name))[1]
+                if ext not in newest or entry.name.startswith("."):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if mtime > newest[ext][1]:
+                    newest[ext] = (entry.path, mtime)
+        path = newest[".xml"][0] or newest[".csv"][0]
+        return Path(path) if path else None
+
+    def _iter_result_rows(self, result_file: Path):
+        """Yield one result dict per well-formed row of an optimization report (XML or CSV)."""
+        # Sniff the first bytes: MT5 writes SpreadsheetML, but older
+        # exports and the CSV fallback are plain text
+        with open(result_file, "rb") as f:
+            is_xml = f.read(64).lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<")
+
+        if is_xml:
+            yield from self._rows_to_results(self._iter_xml_rows(result_file))
+            return
+
+        # Stream rows through the C csv reader
+        with open(result_file, "r", encoding="utf-8", errors="ignore", newline="") as f:
+            yield from self._rows_to_results(csv.reader(f))
+
+    @staticmethod
+    def _iter_xml_rows(result_file: Path):
+        """Stream SpreadsheetML <Row>s as lists of cell strings (constant memory)."""
+        for _, elem in ET.iterparse(str(result_file), events=("end",)):
+            if elem.tag.rsplit("}", 1)[-1] != "Row":
+                continue
+            values = []
+            for cell in elem:
+                if cell.tag.rsplit("}", 1)[-1] != "Cell":
+                    continue
+                # ss:Index (1-based) skips empty cells
+                index = next((v for k, v in cell.attrib.items() if k.endswith("Index")), None)
+                if index is not None:
+                    values.extend([""] * (int(index) - 1 - len(values)))
+                data = next(iter(cell), None)
+                values.append((data.text or "") if data is not None else "")
+            elem.clear()
+            yield values
+
+    def _rows_to_results(self, rows):
+        """Map header + value rows to result dicts; column positions are resolved once."""
+        headers = [h.strip() for h in next(rows, [])]
+        n_cols = len(headers)
+        col = {h: i for i, h in enumerate(headers)}
+        param_cols = [(h, col[h]) for h in col if h not in self.RESULT_METRIC_COLUMNS]
+        pf_i = col.get("Profit Factor")
+        profit_i = col.get("Profit")
+        dd_i = col.get("DD%", col.get("Equity DD %"))
+        trades_i = col.get("Trades")
+
+        for values in rows:
+            if len(values) != n_cols:
+                continue
+            values = [v.strip() for v in values]
+            try:
+                yield {
+                    "params": {h: values[i] for h, i in param_cols},
+                    "profit_factor": float(values[pf_i] or 0) if pf_i is not None else 0.0,
+                    "net_profit": float(values[profit_i] or 0) if profit_i is not None else 0.0,
+                    "drawdown": float(values[dd_i] or 0) if dd_i is not None else 0.0,
+                    "total_trades": int(values[trades_i] or 0) if trades_i is not None else 0,
+                }
+            except ValueError:
+                continue
+
+    @staticmethod
+    def _cache_enabled() -> bool:
+        return os.environ.get("MT5_WFO_CACHE", "1") != "0"
+
+    @staticmethod
+    def _cache_key(
+        ea_name: str,
+        symbol: str,
+        date_from: str,
+        date_to: str,
+        param_ranges: Dict[str, Tuple],
+        criterion: int,
+        tester_settings: Tuple = ()
+    ) -> str:
+        """
+        Stable short hash of everything that determines an optimization run.
+
+        tester_settings holds the other INI values the results depend on
+        (period, model, deposit, currency, leverage).
+        """
+        ranges = sorted((name, list(spec)) for name, spec in param_ranges.items())
+        payload = json.dumps(
+            [ea_name, symbol, date_from, date_to, ranges, criterion, list(tester_settings)],
+            sort_keys=True, default=str
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _ea_version(self, ea_name: str) -> Optional[int]:
+        """Newest mtime_ns of the EA's .mq5/.ex5 (None if neither is found)."""
+        mtimes = []
+        for path in self._ea_files(self.file_manager.experts_dir, ea_name):
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except OSError:
+                continue
+        return max(mtimes) if mtimes else None
+
+    def _load_cached_results(
+        self, key: str, ea_version: Optional[int], top_n: int
+    ) -> Optional[Tuple[List[Dict], int]]:
+        """Cached (results, total) for key, unless the EA changed since or too few rows were kept."""
+        cache_file = self.cfg.data_path / self.CACHE_DIR_NAME / f"{key}.json"
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("ea_version") != ea_version:
+            return None
+        results = cached.get("results") or []
+        total = cached.get("total", len(results))
+        if len(results) < min(top_n, total):
+            return None
+        return results, total
+
+    def _store_cached_results(
+        self, key: str, ea_version: Optional[int], results: List[Dict], total: int
+    ):
+        """Persist parsed results; a failed write only costs the cache."""
+        cache_dir = self.cfg.data_path / self.CACHE_DIR_NAME
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_dir / f"{key}.json.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"ea_version": ea_version, "results": results, "total": total}, f)
+            os.replace(tmp_path, cache_dir / f"{key}.json")
+        except OSError as e:
+            logger.warning(f"Could not write optimization cache: {str(e)}")
 
     def _run_mt5_optimization(self, ini_path: Path, timeout: int = 1800) -> bool:
         """Launch MT5 and run optimization silently."""
-        status = get_mt5_status()
-        if status.get("is_running"):
-            self.process_control.stop_mt5(force=False)
-            time.sleep(3)
-
         cmd = [str(self.mt5_exe), f"/config:{ini_path}"]
+        if self.portable:
+            # Own install folder: leave the main terminal alone
+            cmd.append("/portable")
+        else:
+            status = get_mt5_status()
+            if status.get("is_running"):
+                self.process_control.stop_mt5(force=False)
+                time.sleep(3)
+
         logger.info(f"Starting optimization: {' '.join(cmd)}")
-        proc = subprocess.Popen(cmd)
+        # CREATE_NO_WINDOW only exists on Windows
+        proc = subprocess.Popen(cmd, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
 
-        start_time = time.time()
-        while proc.poll() is None:
-            if time.time() - start_time > timeout:
-                proc.terminate()
-                logger.error(f"Optimization timeout after {timeout}s")
-                return False
-            time.sleep(10)
+        # Block on process exit instead of polling
+        try:
+            proc.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            logger.error(f"Optimization timeout after {timeout}s")
+            return False
+
+    @staticmethod
+    def _suggest_params(trial, param_ranges: Dict[str, Tuple]) -> Dict[str, Any]:
+        """Draw one point from the (min, max, step) grid."""
+        params = {}
+        for name, (min_val, max_val, step) in param_ranges.items():
+            if all(isinstance(v, int) for v in (min_val, max_val, step)):
+                params[name] = trial.suggest_int(name, min_val, max_val, step=step)
+            else:
+                params[name] = trial.suggest_float(
+                    name, float(min_val), float(max_val), step=float(step)
+                )
+        return params
 
-        return True
+    def _run_sampled_search(
+        self,
+        ea_name: str,
+        param_ranges: Dict[str, Tuple],
+        symbol: str,
+        date_from: str,
+        date_to: str,
+        sampler: str,
+        timeout: int
+    ) -> List[Dict]:
+        """
+        Search param_ranges with Optuna, one MT5 backtest per trial.
+
+        Returns results in the same shape as _parse_optimization_results.
+        """
+        if sampler == "nsga2":
+            study_sampler = optuna.samplers.NSGAIISampler()
+        else:
+            study_sampler = optuna.samplers.TPESampler(
+                n_startup_trials=self.TPE_STARTUP_TRIALS
+            )
+        study = optuna.create_study(direction="maximize", sampler=study_sampler)
+        results = []
+
+        def objective(trial) -> float:
+            params = self._suggest_params(trial, param_ranges)
+            bt = self._backtest_params(
+                ea_name, symbol, date_from, date_to, params, f"trial_{date_from}",
+                self.cfg.backtest_timeout
+            )
+            if bt.get("status") != "success":
+                return 0.0
+            results.append({
+                "params": params,
+                "profit_factor": bt.get("profit_factor", 0.0),
+                "net_profit": bt.get("net_profit", 0.0),
+                "drawdown": bt.get("drawdown", 0.0),
+                "total_trades": bt.get("total_trades", 0),
+            })
+            return bt.get("profit_factor", 0.0)
+
+        study.optimize(objective, n_trials=self.SAMPLED_TRIALS, timeout=timeout)
+        return results
 
     def run_optimization(
         self,
@@ -183,7 +580,9 @@ class MT5Optimizer:
         periods: List[str],
         top_n: int = 10,
         criterion: int = 0,
-        timeout: int = 1800
+        timeout: int = 1800,
+        sampler: str = "grid",
+        notify: bool = True
     ) -> Dict[str, Any]:
         """
         Run parameter optimization silently.
@@ -196,6 +595,9 @@ class MT5Optimizer:
             top_n: Return top N parameter sets
             criterion: 0=Balance, 1=Drawdown, 2=ProfitFactor, 3=Sharpe
             timeout: Max seconds
+            sampler: "grid" (MT5 optimizer over the full grid), "tpe" or
+                     "nsga2" (Optuna-driven single backtests, ranked by PF)
+            notify: Send start/done messages (failures are always sent)
 
         Returns:
             {status, top_params (sorted best→worst), total_combinations, error}
@@ -212,34 +614,78 @@ class MT5Optimizer:
         try:
             date_from = periods[0] if len(periods) > 0 else "2024.01.01"
             date_to = periods[1] if len(periods) > 1 else "2024.12.31"
+            timeframe = 1
 
-            # Write ini
-            ini_path = self._write_optimization_ini(
-                ea_name, symbol, 1, date_from, date_to, param_ranges, criterion
-            )
-
-            # Run MT5 optimization
-            send(f"⚙️ Optimization started: {ea_name} {symbol}", severity="info")
-            success = self._run_mt5_optimization(ini_path, timeout)
-
-            if not success:
-                result["error"] = "Optimization timeout or failed"
+            if sampler != "grid" and optuna is None:
+                result["error"] = f"optuna not installed (required for sampler={sampler!r})"
                 return result
 
-            # Parse results
-            all_results = self._parse_optimization_results()
-            result["total_combinations"] = len(all_results)
+            # Identical run already done for this EA build: skip MT5 entirely
+            all_results = None
+            total = 0
+            use_cache = sampler == "grid" and self._cache_enabled()
+            if use_cache:
+                cache_key = self._cache_key(
+                    ea_name, symbol, date_from, date_to, param_ranges, criterion,
+                    (timeframe, self.OPTIMIZATION_MODEL, self.cfg.deposit,
+                     self.cfg.currency, self.cfg.leverage)
+                )
+                ea_version = self._ea_version(ea_name)
+                cached_entry = self._load_cached_results(cache_key, ea_version, top_n)
+                if cached_entry is not None:
+                    all_results, total = cached_entry
+                    logger.info(f"Using cached optimization results: {cache_key}")
+
+            cached = all_results is not None
+            if sampler != "grid":
+                if notify:
+                    send(f"⚙️ Optimization started ({sampler}): {ea_name} {symbol}", severity="info")
+                all_results = self._run_sampled_search(
+                    ea_name, param_ranges, symbol, date_from, date_to, sampler, timeout
+                )
+                all_results.sort(key=lambda x: x.get("profit_factor", 0), reverse=True)
+                total = len(all_results)
+            elif not cached:
+                # Write ini
+                ini_path, report_path = self._write_optimization_ini(
+                    ea_name, symbol, timeframe, date_from, date_to, param_ranges, criterion
+                )
 
-            # Sort by profit factor, return top N
-            all_results.sort(key=lambda x: x.get("profit_factor", 0), reverse=True)
+                # Run MT5 optimization
+                if notify:
+                    send(f"⚙️ Optimization started: {ea_name} {symbol}", severity="info")
+                launched = time.time()
+                try:
+                    success = self._run_mt5_optimization(ini_path, timeout)
+
+                    if not success:
+                        result["error"] = "Optimization timeout or failed"
+                        return result
+
+                    # Parse only the best top_n results by profit factor. Only
+                    # the report this run named is cached: a Tester-folder
+                    # fallback can't be tied to this key for certain
+                    from_report = report_path.is_file()
+                    all_results, total = self._parse_optimization_results(
+                        top_n, report_path, not_before=launched
+                    )
+                    if use_cache and all_results and from_report:
+                        self._store_cached_results(cache_key, ea_version, all_results, total)
+                finally:
+                    # The report is unique per run; parsed (and cached) it's spent
+                    self._remove_quietly(report_path)
+
+            # Return top N
+            result["total_combinations"] = total
             result["top_params"] = all_results[:top_n]
             result["status"] = "success"
 
-            best_pf = result["top_params"][0]["profit_factor"] if result["top_params"] else 0
-            send(
-                f"✅ Optimization done: {ea_name} | {len(all_results)} combos | Best PF={best_pf:.2f}",
-                severity="info"
-            )
+            if notify:
+                best_pf = result["top_params"][0]["profit_factor"] if result["top_params"] else 0
+                send(
+                    f"✅ Optimization done{' (cached)' if cached else ''}: {ea_name} | {total} combos | Best PF={best_pf:.2f}",
+                    severity="info"
+                )
 
         except Exception as e:
             result["error"] = str(e)
@@ -261,6 +707,21 @@ class MT5Optimizer:
         Returns list of:
           {"is_from", "is_to", "oos_from", "oos_to"}
         """
+        # Fresh dicts per call; the cached splits themselves stay immutable
+        return [
+            dict(window)
+            for window in self._window_splits(date_from, date_to, n_windows, test_ratio)
+        ]
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _window_splits(
+        date_from: str,
+        date_to: str,
+        n_windows: int,
+        test_ratio: float
+    ) -> Tuple[Tuple[Tuple[str, Any], ...], ...]:
+        """Memoized window boundaries, each window as a tuple of (key, value) items."""
         fmt = "%Y.%m.%d"
         start = datetime.strptime(date_from, fmt)
         end = datetime.strptime(date_to, fmt)
@@ -281,19 +742,167 @@ class MT5Optimizer:
             if oos_to > end:
                 oos_to = end
 
-            windows.append({
-                "window": i + 1,
-                "is_from": is_from.strftime(fmt),
-                "is_to": is_to.strftime(fmt),
-                "oos_from": oos_from.strftime(fmt),
-                "oos_to": oos_to.strftime(fmt),
-            })
+            windows.append((
+                ("window", i + 1),
+                ("is_from", is_from.strftime(fmt)),
+                ("is_to", is_to.strftime(fmt)),
+                ("oos_from", oos_from.strftime(fmt)),
+                ("oos_to", oos_to.strftime(fmt)),
+            ))
 
             cursor = oos_from
             if cursor >= end:
                 break
 
-        return windows
+        return tuple(windows)
+
+    def _run_single_window(
+        self,
+        window: Dict,
+        ea_name: str,
+        symbol: str,
+        param_ranges: Dict[str, Tuple],
+        timeout: int,
+        sampler: str = "grid"
+    ) -> Dict:
+        """Optimize one window's IS period and validate the best params on its OOS period."""
+        logger.info(f"Window {window['window']}: IS {window['is_from']}→{window['is_to']} | OOS {window['oos_from']}→{window['oos_to']}")
+
+        # 1. Optimize on IS period
+        opt = self.run_optimization(
+            ea_name, param_ranges, symbol,
+            [window["is_from"], window["is_to"]],
+            top_n=1,
+            timeout=timeout,
+            sampler=sampler,
+            notify=False
+        )
+
+        best_params = opt["top_params"][0] if opt["top_params"] else {}
+        is_pf = best_params.get("profit_factor", 0)
+
+        # Nothing worth validating: skip the OOS backtest. Skipped windows
+        # count as OOS PF 0, so WF efficiency can only come out lower.
+        min_is_pf = getattr(self.cfg, "wf_min_is_pf", 0)
+        if is_pf < min_is_pf:
+            logger.info(f"Window {window['window']}: IS PF {is_pf:.2f} < {min_is_pf} — OOS skipped")
+            return {
+                **window,
+                "is_profit_factor": is_pf,
+                "oos_profit_factor": 0.0,
+                "best_params": {},
+                "efficiency": 0,
+                "skipped": True
+            }
+
+        # 2. Validate best params on OOS period, on the same terminal so
+        # windows on different workers validate concurrently
+        # Build set file from best params (one per window)
+        oos_pf = 0.0
+        oos_ok = False
+        if best_params:
+            oos_result = self._backtest_params(
+                ea_name, symbol, window["oos_from"], window["oos_to"],
+                best_params.get("params", {}), f"w{window['window']}", 300
+            )
+            oos_pf = oos_result.get("profit_factor", 0)
+            oos_ok = oos_result.get("status") == "success"
+
+        # 3. Optional robustness check: same OOS range with each param nudged
+        stability = None
+        if oos_ok and getattr(self.cfg, "wf_stability_check", False):
+            stability = self._stability_score(
+                ea_name, symbol, window, best_params.get("params", {}), param_ranges, oos_pf
+            )
+
+        return {
+            **window,
+            "is_profit_factor": is_pf,
+            "oos_profit_factor": oos_pf,
+            "best_params": best_params.get("params", {}),
+            "efficiency": (oos_pf / is_pf) if is_pf > 0 else 0,
+            "skipped": False,
+            "stability": stability
+        }
+
+    @staticmethod
+    def _jitter_params(
+        params: Dict, pct: float = 0.05, ranges: Optional[Dict[str, Tuple]] = None
+    ) -> List[Dict]:
+        """
+        Neighbours of params: each numeric value (only those in ranges, if
+        given) moved down and up by pct, integers by at least 1, one param
+        at a time. Non-numeric values are left alone.
+
+        With ranges ({name: (min, max, step)}), a value of 0 moves by one
+        step instead, and neighbours are clamped to [min, max]; one that
+        would equal the original value (at a bound) is left out, since it
+        would only repeat the original result.
+        """
+        neighbours = []
+        for name, value in params.items():
+            if ranges is not None and name not in ranges:
+                continue
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                continue
+            is_int = isinstance(value, int) or (isinstance(value, str) and value.strip().lstrip("+-").isdigit())
+            low, high, step = ranges[name] if ranges is not None else (None, None, 0)
+            delta = abs(number) * pct or abs(float(step))
+            if not delta and not is_int:
+                continue
+            for sign in (-1, 1):
+                if is_int:
+                    moved = int(number) + sign * max(int(round(delta)), 1)
+                else:
+                    moved = round(number + sign * delta, 8)
+                if low is not None:
+                    moved = min(max(moved, type(moved)(low)), type(moved)(high))
+                if moved == number:
+                    continue
+                neighbours.append({**params, name: moved})
+        return neighbours
+
+    def _stability_score(
+        self,
+        ea_name: str,
+        symbol: str,
+        window: Dict,
+        params: Dict,
+        param_ranges: Dict[str, Tuple],
+        oos_pf: float
+    ) -> Optional[float]:
+        """
+        1 - (std / mean) of OOS PF over the best params and their jittered
+        neighbours, clamped to [0, 1]; 1.0 means the result does not move
+        at all.
+
+        Failed neighbour backtests are left out. None (not computed) when
+        fewer than two PFs remain or their mean is not positive.
+
+        Backtests share this worker's terminal, so they run one after
+        another; other windows keep running on their own terminals.
+        """
+        pfs = [oos_pf]
+        for i, neighbour in enumerate(self._jitter_params(params, ranges=param_ranges)):
+            bt = self._backtest_params(
+                ea_name, symbol, window["oos_from"], window["oos_to"],
+                neighbour, f"w{window['window']}_j{i}", 300
+            )
+            if bt.get("status") == "success":
+                pfs.append(bt.get("profit_factor", 0.0))
+        return self._pf_stability(pfs)
+
+    @staticmethod
+    def _pf_stability(pfs: List[float]) -> Optional[float]:
+        """1 - (std / mean) of pfs clamped to [0, 1]; None if it can't be computed."""
+        if len(pfs) < 2:
+            return None
+        mean = statistics.mean(pfs)
+        if mean <= 0:
+            return None
+        return min(max(1.0 - statistics.pstdev(pfs) / mean, 0.0), 1.0)
 
     def walk_forward_test(
         self,
@@ -304,7 +913,8 @@ class MT5Optimizer:
         date_to: str = "2024.12.31",
         n_windows: int = 4,
         test_ratio: float = 0.3,
-        timeout_per_window: int = 900
+        timeout_per_window: int = 900,
+        sampler: str = "grid"
     ) -> Dict[str, Any]:
         """
         Walk-forward optimization and out-of-sample validation.
@@ -320,6 +930,7 @@ class MT5Optimizer:
             n_windows: Number of walk-forward windows
             test_ratio: OOS ratio (0.3 = 30%)
             timeout_per_window: Seconds per optimization
+            sampler: IS search mode, see run_optimization
 
         Returns:
             {status, wf_efficiency, windows, best_params, summary, error}
@@ -333,94 +944,105 @@ class MT5Optimizer:
             "error": None
         }
 
-        try:
-            windows = self._split_walk_forward_windows(
-                date_from, date_to, n_windows, test_ratio
-            )
-
-            send(
-                f"⚙️ Walk-Forward started: {ea_name} | {n_windows} windows",
-                severity="info"
-            )
-
-            window_results = []
-            for window in windows:
-                logger.info(f"Window {window['window']}: IS {window['is_from']}→{window['is_to']} | OOS {window['oos_from']}→{window['oos_to']}")
-
-                # 1. Optimize on IS period
-                opt = self.run_optimization(
-                    ea_name, param_ranges, symbol,
-                    [window["is_from"], window["is_to"]],
-                    top_n=1,
-                    timeout=timeout_per_window
+        # Window progress and the final summary go out as one message
+        with _NotifyBatcher() as batch:
+            try:
+                windows = self._split_walk_forward_windows(
+                    date_from, date_to, n_windows, test_ratio
                 )
 
-                best_params = opt["top_params"][0] if opt["top_params"] else {}
-                is_pf = best_params.get("profit_factor", 0)
-
-                # 2. Validate best params on OOS period
-                # Build set file from best params
-                oos_pf = 0.0
-                if best_params:
-                    set_path = self._write_params_set_file(ea_name, best_params.get("params", {}))
-                    from tools.tester import run_backtest
-                    oos_result = run_backtest(
-                        ea_name, symbol, 1,
-                        window["oos_from"], window["oos_to"],
-                        set_file=str(set_path),
-                        timeout=300
-                    )
-                    oos_pf = oos_result.get("profit_factor", 0)
-
-                window_results.append({
-                    **window,
-                    "is_profit_factor": is_pf,
-                    "oos_profit_factor": oos_pf,
-                    "best_params": best_params.get("params", {}),
-                    "efficiency": (oos_pf / is_pf) if is_pf > 0 else 0
-                })
-
-            # Calculate WF efficiency (avg OOS PF / avg IS PF)
-            avg_is = sum(w["is_profit_factor"] for w in window_results) / len(window_results)
-            avg_oos = sum(w["oos_profit_factor"] for w in window_results) / len(window_results)
-            wf_efficiency = (avg_oos / avg_is) if avg_is > 0 else 0
-
-            # Best params = from the window with highest OOS PF
-            best_window = max(window_results, key=lambda w: w["oos_profit_factor"])
-
-            result["status"] = "success"
-            result["wf_efficiency"] = round(wf_efficiency, 4)
-            result["windows"] = window_results
-            result["best_params"] = best_window["best_params"]
-            result["summary"] = {
-                "n_windows": len(window_results),
-                "avg_is_pf": round(avg_is, 4),
-                "avg_oos_pf": round(avg_oos, 4),
-                "wf_efficiency": round(wf_efficiency, 4),
-                "is_robust": wf_efficiency >= 0.7,
-            }
+                send(
+                    f"⚙️ Walk-Forward started: {ea_name} | {n_windows} windows",
+                    severity="info"
+                )
 
-            send(
-                f"✅ Walk-Forward done: {ea_name} | WF efficiency={wf_efficiency:.2f} | {'Robust ✅' if wf_efficiency >= 0.7 else 'Not robust ⚠️'}",
-                severity="info"
-            )
+                # Portable terminals only: the main terminal's runs stop any
+                # MT5 they find, workers included. Without them windows run
+                # one after another on this terminal
+                workers = self._portable_workers() or [self]
+                n_workers = min(len(windows), len(workers), max((os.cpu_count() or 2) // 2, 1))
+                idle = queue.Queue()
+                for worker in workers[:n_workers]:
+                    worker._install_ea(ea_name)
+                    idle.put(worker)
+
+                def run_window(window: Dict) -> Dict:
+                    worker = idle.get()
+                    try:
+                        return worker._run_single_window(
+                            window, ea_name, symbol, param_ranges, timeout_per_window, sampler
+                        )
+                    finally:
+                        idle.put(worker)
+
+                window_results = []
+                with ThreadPoolExecutor(max_workers=n_workers) as pool:
+                    futures = [pool.submit(run_window, window) for window in windows]
+                    for future in as_completed(futures):
+                        window_result = future.result()
+                        window_results.append(window_result)
+                        batch.add(
+                            f"🪟 WF window {window_result['window']}/{len(windows)}: "
+                            f"IS PF={window_result['is_profit_factor']:.2f} | "
+                            + (
+                                "OOS skipped" if window_result["skipped"]
+                                else f"OOS PF={window_result['oos_profit_factor']:.2f}"
+                            )
+                        )
+                window_results.sort(key=lambda w: w["window"])
+
+                # Calculate WF efficiency (avg OOS PF / avg IS PF)
+                avg_is = sum(w["is_profit_factor"] for w in window_results) / len(window_results)
+                avg_oos = sum(w["oos_profit_factor"] for w in window_results) / len(window_results)
+                wf_efficiency = (avg_oos / avg_is) if avg_is > 0 else 0
+
+                # Best params = from the window with highest OOS PF
+                best_window = max(window_results, key=lambda w: w["oos_profit_factor"])
+
+                result["status"] = "success"
+                result["wf_efficiency"] = round(wf_efficiency, 4)
+                result["windows"] = window_results
+                result["best_params"] = best_window["best_params"]
+                result["summary"] = {
+                    "n_windows": len(window_results),
+                    "avg_is_pf": round(avg_is, 4),
+                    "avg_oos_pf": round(avg_oos, 4),
+                    "wf_efficiency": round(wf_efficiency, 4),
+                    "is_robust": wf_efficiency >= 0.7,
+                }
+                stabilities = [w["stability"] for w in window_results if w.get("stability") is not None]
+                if stabilities:
+                    result["summary"]["avg_stability"] = round(statistics.mean(stabilities), 4)
+
+                batch.add(
+                    f"✅ Walk-Forward done: {ea_name} | WF efficiency={wf_efficiency:.2f} | {'Robust ✅' if wf_efficiency >= 0.7 else 'Not robust ⚠️'}"
+                )
 
-        except Exception as e:
-            result["error"] = str(e)
-            logger.error(f"Walk-forward error: {str(e)}")
-            send(f"❌ Walk-Forward failed: {ea_name} | {str(e)}", severity="critical")
+            except Exception as e:
+                result["error"] = str(e)
+                logger.error(f"Walk-forward error: {str(e)}")
+                send(f"❌ Walk-Forward failed: {ea_name} | {str(e)}", severity="critical")
 
         return result
 
-    def _write_params_set_file(self, ea_name: str, params: Dict) -> Path:
-        """Write .set file from param dict for OOS validation."""
-        set_path = self.data_path / f"{ea_name}_wf_oos.set"
-        lines = []
-        for key, value in params.items():
-            lines.append(f"{key}={value}")
-        with open(set_path, "w") as f:
-            f.write("\n".join(lines))
-        return set_path
+    def _write_params_set_file(self, ea_name: str, params: Dict, tag: str = "") -> Path:
+        """
+        Write .set file from param dict for OOS validation.
+
+        The file goes to the system temp folder under a unique name that
+        starts with the tag (e.g. the window) and a hash of the params, so
+        concurrent windows never share a file; the caller deletes it once
+        the backtest is done (see _backtest_params).
+        """
+        safe_ea_name = ea_name.replace("\\", "_").replace("/", "_")
+        digest = hashlib.blake2b(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8"), digest_size=6
+        ).hexdigest()
+        name = f"{safe_ea_name}_wf_oos_{tag}_{digest}" if tag else f"{safe_ea_name}_wf_oos_{digest}"
+        fd, path = tempfile.mkstemp(prefix=f"{name}_", suffix=".set")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(f"{key}={value}" for key, value in params.items()))
+        return Path(path)
 
 
 # Module-level singleton
@@ -439,18 +1061,18 @@ def run_optimization(
     param_ranges: Dict[str, Tuple],
     symbol: str = None,
     periods: List[str] = None,
-    top_n: int = None
+    top_n: int = None,
+    sampler: str = "grid"
 ) -> Dict[str, Any]:
     """Run optimization — ถ้าไม่ระบุ symbol/periods/top_n จะใช้ค่า default จาก user_config.json"""
-    import sys
-    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-    from config.config import get_config
-    _cfg = get_config()
-    return _get_optimizer().run_optimization(
+    optimizer = _get_optimizer()
+    _cfg = optimizer.cfg
+    return optimizer.run_optimization(
         ea_name, param_ranges,
         symbol  or _cfg.default_symbol,
         periods or [_cfg.default_date_from, _cfg.default_date_to],
-        top_n   or _cfg.top_n_results
+        top_n   or _cfg.top_n_results,
+        sampler=sampler
     )
 
 
@@ -461,21 +1083,21 @@ def walk_forward_test(
     date_from: str = None,
     date_to: str = None,
     n_windows: int = None,
-    test_ratio: float = None
+    test_ratio: float = None,
+    sampler: str = "grid"
 ) -> Dict[str, Any]:
     """Walk-forward test — ถ้าไม่ระบุ จะใช้ค่า default จาก user_config.json"""
-    import sys
-    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-    from config.config import get_config
-    _cfg = get_config()
-    return _get_optimizer().walk_forward_test(
+    optimizer = _get_optimizer()
+    _cfg = optimizer.cfg
+    return optimizer.walk_forward_test(
         ea_name,
         symbol    or _cfg.default_symbol,
         param_ranges,
         date_from or _cfg.default_date_from,
         date_to   or _cfg.default_date_to,
         n_windows or _cfg.wf_windows,
-        test_ratio or _cfg.wf_test_ratio
+        test_ratio or _cfg.wf_test_ratio,
+        sampler=sampler
     )
 
 
@@ -28,6 +28,11 @@ except ImportError:
     win32api = None
     win32con = None
 
+try:
+    import win32event
+except ImportError:
+    win32event = None
+
 
 class MT5ProcessControl:
     """
@@ -37,6 +42,11 @@ class MT5ProcessControl:
     # MT5 Configuration
     MT5_PROCESS_NAME = "terminal.exe"
     MT5_WINDOW_CLASS = "MetaTrader 5"
+
+    # Window detection after launch: poll fast, back off to the ceiling
+    STARTUP_TIMEOUT = 30  # seconds
+    STARTUP_POLL_MIN = 0.05
+    STARTUP_POLL_MAX = 0.5
     MT5_EXECUTABLE_PATHS = [
         r"C:\Program Files\MetaTrader 5\terminal.exe",
         r"C:\Program Files (x86)\MetaTrader 5\terminal.exe",
@@ -48,6 +58,37 @@ class MT5ProcessControl:
         self.watch_thread = None
         self.watch_active = False
         self.mt5_process = None
+        self._cached_hwnd: Optional[int] = None
+        self._cached_proc = None  # psutil.Process of the last MT5 seen
+
+        # stop_watch() signals both: the Win32 event wakes a process-exit
+        # wait, the threading.Event wakes the plain sleep fallback
+        self._watch_stop = threading.Event()
+        self._watch_stop_handle = (
+            win32event.CreateEvent(None, True, False, None) if win32event else None
+        )
+
+    def _open_wait_handle(self, pid: int):
+        """SYNCHRONIZE handle for pid, or None when waiting on it isn't possible."""
+        if not (win32event and win32api and win32con and pid):
+            return None
+        try:
+            return win32api.OpenProcess(win32con.SYNCHRONIZE, False, pid)
+        except Exception:
+            return None
+
+    def _wait_for_exit(self, handle, timeout: float) -> bool:
+        """
+        Sleep up to timeout seconds, waking early on process exit or
+        stop_watch(). Returns True if the process exited.
+        """
+        if handle is not None and self._watch_stop_handle is not None:
+            rc = win32event.WaitForMultipleObjects(
+                [handle, self._watch_stop_handle], False, int(timeout * 1000)
+            )
+            return rc == win32event.WAIT_OBJECT_0
+        self._watch_stop.wait(timeout)
+        return False
 
     @staticmethod
     def _get_mt5_exe() -> Optional[str]:
@@ -57,23 +98,42 @@ class MT5ProcessControl:
                 return path
         return None
 
-    @staticmethod
-    def _get_mt5_window() -> Optional[int]:
-        """Get MT5 main window handle."""
+    def _get_mt5_window(self) -> Optional[int]:
+        """Get MT5 main window handle (cached while that window still exists)."""
         if not win32gui:
             return None
 
         try:
-            hwnd = win32gui.FindWindow(None, MT5ProcessControl.MT5_WINDOW_CLASS)
-            if hwnd != 0:
+            hwnd = self._cached_hwnd
+            if hwnd and win32gui.IsWindow(hwnd) and "MetaTrader 5" in win32gui.GetWindowText(hwnd):
                 return hwnd
+            self._cached_hwnd = None
 
-            # Try to find by partial title match
-            windows = []
-            win32gui.EnumWindows(lambda h, x: windows.append((h, win32gui.GetWindowText(h))), None)
-            for hwnd, title in windows:
-                if "MetaTrader 5" in title:
-                    return hwnd
+            # By window class first, then by exact title
+            hwnd = (
+                win32gui.FindWindow(self.MT5_WINDOW_CLASS, None)
+                or win32gui.FindWindow(None, self.MT5_WINDOW_CLASS)
+            )
+
+            if not hwnd:
+                # Try to find by partial title match, stopping at the first hit
+                found = []
+
+                def _match(h, _):
+                    if "MetaTrader 5" in win32gui.GetWindowText(h):
+                        found.append(h)
+                        return False
+                    return True
+
+                try:
+                    win32gui.EnumWindows(_match, None)
+                except Exception:
+                    pass  # pywin32 raises when the callback stops the enumeration
+                hwnd = found[0] if found else 0
+
+            if hwnd:
+                self._cached_hwnd = hwnd
+                return hwnd
         except Exception:
             pass
 
@@ -144,15 +204,17 @@ class MT5ProcessControl:
 
             # Wait for process to be fully loaded
             self.mt5_process = process
-            max_wait = 30  # seconds
-            wait_increment = 0.5
+            delay = self.STARTUP_POLL_MIN
             window_found = False
 
-            while (time.time() - start_time) < max_wait:
+            while (time.time() - start_time) < self.STARTUP_TIMEOUT:
                 if self._get_mt5_window():
                     window_found = True
                     break
-                time.sleep(wait_increment)
+                if process.poll() is not None:
+                    break  # terminal exited during startup, no window coming
+                time.sleep(delay)
+                delay = min(delay * 1.5, self.STARTUP_POLL_MAX)
 
             if window_found:
                 result["status"] = "success"
@@ -160,7 +222,12 @@ class MT5ProcessControl:
                 result["startup_time"] = time.time() - start_time
                 result["message"] = f"MT5 started successfully (PID: {process.pid})"
             else:
-                result["error"] = "MT5 window not detected within timeout"
+                exit_code = process.poll()
+                result["error"] = (
+                    f"MT5 exited during startup (exit code {exit_code})"
+                    if exit_code is not None
+                    else "MT5 window not detected within timeout"
+                )
                 result["pid"] = process.pid
                 result["startup_time"] = time.time() - start_time
 
@@ -221,6 +288,7 @@ class MT5ProcessControl:
                 if hwnd and win32gui:
                     try:
                         win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+                        self._cached_hwnd = None
 
                         # Wait for process to terminate
                         max_wait = 10
@@ -259,6 +327,10 @@ class MT5ProcessControl:
         except Exception as e:
             result["error"] = str(e)
 
+        if result["status"] == "success":
+            self._cached_hwnd = None
+            self._cached_proc = None
+
         return result
 
     def restart_mt5(self, wait_seconds: int = 5) -> Dict[str, Any]:
@@ -409,17 +481,27 @@ class MT5ProcessControl:
                 return result
 
             self.watch_active = True
+            self._watch_stop.clear()
+            if self._watch_stop_handle is not None:
+                win32event.ResetEvent(self._watch_stop_handle)
 
             def _watch_loop():
-                """Background watch loop."""
+                """Background watch loop; sleeps on the MT5 process handle when possible."""
                 last_pid = None
                 restart_count = 0
+                handle_pid, handle = None, None
 
                 while self.watch_active:
                     try:
                         status = self.get_mt5_status()
                         current_pid = status["pid"]
 
+                        # Keep one wait handle per MT5 process
+                        if current_pid != handle_pid:
+                            if handle is not None:
+                                handle.Close()
+                            handle_pid, handle = current_pid, self._open_wait_handle(current_pid)
+
                         # Detect crash
                         if last_pid and not current_pid:
                             if callback:
@@ -440,12 +522,20 @@ class MT5ProcessControl:
                                 callback("unresponsive", {"pid": current_pid})
 
                         last_pid = current_pid
-                        time.sleep(interval)
+                        # Exit wakes us at once; otherwise re-check responsiveness
+                        if self._wait_for_exit(handle, interval):
+                            # Signalled handles stay signalled: drop it so a
+                            # lingering PID falls back to the plain sleep
+                            handle.Close()
+                            handle = None
 
                     except Exception as e:
                         if callback:
                             callback("watch_error", {"error": str(e)})
-                        time.sleep(interval)
+                        self._watch_stop.wait(interval)
+
+                if handle is not None:
+                    handle.Close()
 
             # Start watch thread
             self.watch_thread = threading.Thread(target=_watch_loop, daemon=True)
@@ -476,6 +566,9 @@ class MT5ProcessControl:
         }
 
         self.watch_active = False
+        self._watch_stop.set()
+        if self._watch_stop_handle is not None:
+            win32event.SetEvent(self._watch_stop_handle)
 
         if self.watch_thread:
             self.watch_thread.join(timeout=2)
@@ -483,12 +576,24 @@ class MT5ProcessControl:
         return result
 
     def _get_mt5_pid(self) -> Optional[int]:
-        """Get MT5 process ID if running."""
+        """Get MT5 process ID if running (last PID is re-checked before a full scan)."""
         try:
             if psutil:
+                # is_running() also compares create time, so a recycled PID
+                # does not count as MT5
+                cached = self._cached_proc
+                if cached is not None:
+                    try:
+                        if cached.is_running():
+                            return cached.pid
+                    except psutil.Error:
+                        pass
+                    self._cached_proc = None
+
                 for proc in psutil.process_iter(['pid', 'name']):
                     try:
                         if proc.info['name'].lower() == self.MT5_PROCESS_NAME:
+                            self._cached_proc = proc
                             return proc.info['pid']
                     except (psutil.NoSuchProcess, psutil.AccessDenied):
                         continue
@@ -39,7 +39,7 @@ TIMEFRAME_MAP = {
 class MT5Tester:
     """Run backtests silently via CLI and collect structured results."""
 
-    def __init__(self):
+    def __init__(self, portable_path: Optional[Path] = None):
         self.file_manager    = MT5FileManager()
         self.process_control = MT5ProcessControl()
         self.log_parser      = MT5LogParser()
@@ -49,6 +49,14 @@ class MT5Tester:
         self.mt5_exe     = self.cfg.terminal_exe
         self.data_path   = self.cfg.data_path
         self.tester_path = self.cfg.tester_path
+
+        # portable_path: MT5 แบบ portable อีกชุด (data อยู่ในโฟลเดอร์ติดตั้ง)
+        # รันด้วย /portable และไม่ไปปิด terminal หลัก
+        self.portable = portable_path is not None
+        if self.portable:
+            self.data_path   = Path(portable_path)
+            self.mt5_exe     = self.data_path / self.cfg.terminal_exe.name
+            self.tester_path = self.data_path / "Tester"
         self.reports_dir = self.data_path / "MQL5" / "Reports"
         self.reports_dir.mkdir(parents=True, exist_ok=True)
 
@@ -248,7 +256,8 @@ class MT5Tester:
 
         try:
             # 1. ตรวจว่า MT5 ปิดอยู่ — ถ้ายังเปิด ต้องปิดก่อน (headless ต้องการ)
-            status = get_mt5_status()
+            #    portable terminal แยกโฟลเดอร์อยู่แล้ว ไม่ต้องปิดตัวหลัก
+            status = get_mt5_status() if not self.portable else {}
             if status.get("is_running"):
                 logger.info("MT5 is running — stopping for headless backtest...")
                 self.process_control.stop_mt5(force=False)
@@ -267,6 +276,8 @@ class MT5Tester:
 
             # 4. Launch MT5 headless — /config สั่งให้รัน backtest แล้วปิดตัวเอง
             cmd = [str(self.mt5_exe), f"/config:{ini_path}"]
+            if self.portable:
+                cmd.append("/portable")
             logger.info(f"Launching: {' '.join(cmd)}")
             proc = subprocess.Popen(cmd)
 